@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Class-level attribute and option access on a deep GlobalInterface hierarchy.
+
+    python benchmarks/bench_environ.py
+"""
+
+import os
+import sys
+import timeit
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic.environ import GlobalInterface  # noqa: E402
+
+
+def make_deep_class(depth=20):
+    cls = GlobalInterface
+    for i in range(depth):
+        attrs = {"package_name": "volkanic"}
+        if i == 0:
+            attrs["_options"] = {"json_backend": "json"}
+        cls = type("GI{}".format(i), (cls,), attrs)
+    return cls
+
+
+def main(number=100000):
+    cls = make_deep_class()
+    cases = {
+        "_get_option (top)": lambda: cls._get_option("project_source_depth"),
+        "_get_option (missing)": lambda: cls._get_option("no_such_option"),
+        "project_name": lambda: cls.project_name,
+        "identifier": lambda: cls.identifier,
+        "package_dir": lambda: cls.package_dir,
+        "_fmt_envvar_name": lambda: cls._fmt_envvar_name("loglevel"),
+        "_get_conf_paths": lambda: cls._get_conf_paths(),
+    }
+    for name, func in cases.items():
+        n = number // 10 if name == "_get_conf_paths" else number
+        seconds = min(timeit.repeat(func, number=n, repeat=3))
+        print("{:<28}{:>10.3f} us/call".format(name, seconds / n * 1e6))
+
+
+if __name__ == "__main__":
+    main()
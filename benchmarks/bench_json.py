@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+JSON backends on an API-like payload full of datetimes, Decimals and UUIDs.
+
+    python benchmarks/bench_json.py
+"""
+
+import datetime
+import decimal
+import importlib.util
+import os
+import sys
+import timeit
+import uuid
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic import jsonio  # noqa: E402
+from volkanic.utils import json_default  # noqa: E402
+
+
+def _legacy_json_default(obj):
+    try:
+        return obj.__json__()
+    except AttributeError:
+        return str(obj)
+
+
+def make_payload(n=200):
+    now = datetime.datetime(2024, 5, 6, 7, 8, 9)
+    return {
+        "items": [
+            {
+                "id": uuid.UUID(int=i),
+                "created_at": now,
+                "price": decimal.Decimal("{}.99".format(i)),
+                "tags": ["a", "b"],
+                "owner": {"name": "user{}".format(i), "active": i % 2 == 0},
+            }
+            for i in range(n)
+        ],
+        "total": n,
+    }
+
+
+def main(number=50):
+    payload = make_payload()
+    kwargs = {"indent": 4, "sort_keys": True, "ensure_ascii": False}
+    json_backend = jsonio.get_json_backend("json")
+    cases = {
+        "json + legacy default": lambda: json_backend.dumps(
+            payload, default=_legacy_json_default, **kwargs
+        ),
+        "json + type-cached default": lambda: json_backend.dumps(
+            payload, default=json_default, **kwargs
+        ),
+    }
+    for name in ["ujson", "orjson"]:
+        if importlib.util.find_spec(name) is None:
+            continue
+        backend = jsonio.get_json_backend(name)
+        cases[name + " (dumpb)"] = lambda b=backend: b.dumpb(
+            payload, default=json_default, **kwargs
+        )
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print("{:<32}{:>10.3f} ms/payload".format(name, seconds / number * 1e3))
+
+
+if __name__ == "__main__":
+    main()
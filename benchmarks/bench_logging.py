@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Per-log-call latency on the calling thread:
+synchronous StreamHandler versus the queued setup.
+
+    python benchmarks/bench_logging.py
+"""
+
+import logging
+import os
+import sys
+import time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic.environ import GlobalInterface  # noqa: E402
+from volkanic.logs import BoundedQueueHandler, JSONLinesFormatter  # noqa: E402
+
+
+def _measure(label, handler, number):
+    logger = logging.Logger("bench")
+    logger.addHandler(handler)
+    t = time.perf_counter()
+    for i in range(number):
+        logger.info("request %s done in %.3f ms", i, 1.5)
+    seconds = time.perf_counter() - t
+    print("{:<28}{:>8.2f} us/call".format(label, seconds / number * 1e6))
+
+
+def main(number=50000):
+    # creating the record alone, the floor of any handler
+    _measure("NullHandler", logging.NullHandler(), number)
+    with open(os.devnull, "w") as devnull:
+        handler = logging.StreamHandler(devnull)
+        handler.setFormatter(logging.Formatter(GlobalInterface.default_logfmt))
+        _measure("StreamHandler, text", handler, number)
+        handler = logging.StreamHandler(devnull)
+        handler.setFormatter(JSONLinesFormatter())
+        _measure("StreamHandler, json lines", handler, number)
+    # the listener is left out to measure the caller side only
+    _measure("BoundedQueueHandler", BoundedQueueHandler(number), number)
+
+
+if __name__ == "__main__":
+    main()
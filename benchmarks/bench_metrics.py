@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Per-call overhead of volkanic.metrics.timed.
+
+    python benchmarks/bench_metrics.py
+"""
+
+import os
+import sys
+import timeit
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic.metrics import MetricRegistry  # noqa: E402
+
+
+def noop():
+    pass
+
+
+def main(number=200000):
+    registry = MetricRegistry()
+    timed_noop = registry.timed(noop)
+    base = min(timeit.repeat(noop, number=number, repeat=5))
+    wrapped = min(timeit.repeat(timed_noop, number=number, repeat=5))
+    print("{:<24}{:>10.3f} us/call".format("plain call", base / number * 1e6))
+    print("{:<24}{:>10.3f} us/call".format("timed call", wrapped / number * 1e6))
+    overhead = (wrapped - base) / number * 1e6
+    print("{:<24}{:>10.3f} us/call".format("overhead", overhead))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Syscalls and time saved by the known-directories cache
+of abs_path_join_and_mkdirs().
+
+    python benchmarks/bench_mkdirs.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic import utils  # noqa: E402
+
+
+class _SyscallCounter:
+    names = ["stat", "mkdir"]
+
+    def __init__(self):
+        self.count = 0
+        self._originals = {}
+
+    def _wrap(self, func):
+        def _func(*args, **kwargs):
+            self.count += 1
+            return func(*args, **kwargs)
+
+        return _func
+
+    def __enter__(self):
+        for name in self.names:
+            self._originals[name] = func = getattr(os, name)
+            setattr(os, name, self._wrap(func))
+        return self
+
+    def __exit__(self, *_):
+        for name, func in self._originals.items():
+            setattr(os, name, func)
+
+
+def _run(label, func, paths):
+    with _SyscallCounter() as counter:
+        t = time.perf_counter()
+        for path in paths:
+            func(path)
+        seconds = time.perf_counter() - t
+    n = len(paths)
+    print(
+        "{:<32}{:>8.3f} us/call {:>6.2f} syscalls/call".format(
+            label, seconds / n * 1e6, counter.count / n
+        )
+    )
+
+
+def _uncached(path):
+    os.makedirs(os.path.split(path)[0], exist_ok=True)
+    return path
+
+
+def main(n=50000):
+    with tempfile.TemporaryDirectory() as root:
+        paths = [os.path.join(root, "d{}".format(i % 8), str(i)) for i in range(n)]
+        _run("makedirs(exist_ok=True)", _uncached, paths)
+        utils.forget_known_dirs()
+        _run("abs_path_join_and_mkdirs", utils.abs_path_join_and_mkdirs, paths)
+
+
+if __name__ == "__main__":
+    main()
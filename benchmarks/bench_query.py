@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+query_object() versus compiled queries on many records.
+
+    python benchmarks/bench_query.py
+"""
+
+import os
+import sys
+import time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic.introspect import MultiQuery, compile_query, query_object  # noqa: E402
+
+dotpaths = ["user.profile.name", "user.profile.age", "user.tags.0", "id"]
+
+
+def make_records(n):
+    return [
+        {
+            "id": i,
+            "user": {
+                "profile": {"name": "u{}".format(i), "age": i % 90},
+                "tags": ["t"],
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def _timed(name, func, n):
+    t = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - t
+    print("{:<28}{:>10.3f} us/record".format(name, seconds / n * 1e6))
+
+
+def main(n=100000):
+    records = make_records(n)
+    queries = [compile_query(dp) for dp in dotpaths]
+    multi_query = MultiQuery(dotpaths)
+
+    def run_query_object():
+        for obj in records:
+            [query_object(obj, dp) for dp in dotpaths]
+
+    def run_compiled():
+        for obj in records:
+            [q(obj) for q in queries]
+
+    _timed("query_object", run_query_object, n)
+    _timed("compile_query", run_compiled, n)
+    _timed("MultiQuery.map", lambda: multi_query.map(records), n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Per-worker conf load time and RSS growth of spawned workers,
+parsing the conf file vs. attaching to GlobalInterface.share_conf().
+
+    python benchmarks/bench_sharedconf.py [workers] [sections]
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic import sharedconf  # noqa: E402,F401
+from volkanic.environ import GlobalInterface  # noqa: E402
+
+_conf_path = os.path.join(tempfile.gettempdir(), "volkanic-bench-sharedconf.json")
+
+
+class _FileGI(GlobalInterface):
+    package_name = "volkanic.bench_file"
+
+    @classmethod
+    def _locate_conf(cls):
+        return _conf_path
+
+    @staticmethod
+    def _parse_conf(path: str) -> dict:
+        with open(path) as fin:
+            return json.load(fin)
+
+
+class _SharedGI(_FileGI):
+    package_name = "volkanic.bench_shared"
+
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as fin:
+            pages = int(fin.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _load_in_worker(shared: bool, queue):
+    rss = _rss_kb()
+    # CPU time, since workers start concurrently
+    start = time.process_time()
+    gi = _SharedGI() if shared else _FileGI()
+    # a worker typically touches a few sections only
+    gi.conf.get("section1")
+    seconds = time.process_time() - start
+    queue.put((seconds, _rss_kb() - rss))
+
+
+def _run_workers(shared: bool, workers: int):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    start = time.perf_counter()
+    procs = [
+        ctx.Process(target=_load_in_worker, args=(shared, queue))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    total = time.perf_counter() - start
+    seconds = sorted(r[0] for r in results)
+    rss = sorted(r[1] for r in results)
+    print(
+        "{:<8}{:>3} workers in {:>6.3f} s   conf load (CPU) median {:>8.3f} ms"
+        "   RSS growth median {:>6} KiB, max {:>6} KiB".format(
+            "shared" if shared else "parse",
+            workers,
+            total,
+            seconds[len(seconds) // 2] * 1e3,
+            rss[len(rss) // 2],
+            rss[-1],
+        )
+    )
+
+
+def main(workers=16, sections=2000):
+    conf = {
+        "section{}".format(i): {
+            "name": "item{}".format(i),
+            "values": list(range(50)),
+            "options": {"k{}".format(j): "v" * 20 for j in range(10)},
+        }
+        for i in range(sections)
+    }
+    with open(_conf_path, "w") as fout:
+        json.dump(conf, fout)
+    print("conf file: {} KiB".format(os.path.getsize(_conf_path) // 1024))
+    try:
+        _run_workers(False, workers)
+        _SharedGI().share_conf()
+        _run_workers(True, workers)
+    finally:
+        os.remove(_conf_path)
+
+
+if __name__ == "__main__":
+    main(*[int(s) for s in sys.argv[1:3]])
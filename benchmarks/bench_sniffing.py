@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Content type sniffing throughput, in memory and on a directory tree.
+
+    python benchmarks/bench_sniffing.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic import sniffing  # noqa: E402
+
+headers = [
+    b"%PDF-1.7\n" + os.urandom(200),
+    b"\xFF\xD8\xFF\xE0" + os.urandom(200),
+    b"RIFF\x24\x00\x00\x00WEBPVP8 " + os.urandom(200),
+    b"\x00\x00\x00\x18ftypmp42" + os.urandom(200),
+    b"PK\x03\x04" + os.urandom(200),
+    b'{"key": "value", "list": [1, 2, 3]}' * 8,
+    os.urandom(256),
+]
+
+
+def main(number=20000, file_count=5000):
+    seconds = timeit.timeit(lambda: [sniffing.sniff(h) for h in headers], number=number)
+    n = number * len(headers)
+    print("{:<24}{:>12,.0f} headers/s".format("sniff()", n / seconds))
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(file_count):
+            dirpath = os.path.join(root, str(i % 50))
+            os.makedirs(dirpath, exist_ok=True)
+            with open(os.path.join(dirpath, str(i)), "wb") as fout:
+                fout.write(headers[i % len(headers)])
+        for workers in [1, 8]:
+            t = time.perf_counter()
+            count = sum(1 for _ in sniffing.sniff_tree(root, workers=workers))
+            seconds = time.perf_counter() - t
+            label = "sniff_tree(workers={})".format(workers)
+            print("{:<24}{:>12,.0f} files/s".format(label, count / seconds))
+
+
+if __name__ == "__main__":
+    main()
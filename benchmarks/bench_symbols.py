@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Per-render overhead of resolving a template context spec.
+
+    python benchmarks/bench_symbols.py
+"""
+
+import os
+import sys
+import timeit
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic.utils import (  # noqa: E402
+    VariableScope,
+    load_symbol,
+    load_symbol_cached,
+    load_variables,
+)
+
+context = [
+    "os.path:join",
+    "os.path:dirname",
+    "json:dumps",
+    "volkanic.utils:indented_json_dumps",
+    "collections:OrderedDict",
+]
+
+
+def main(number=20000):
+    scope = VariableScope(context)
+    cases = {
+        "load_symbol": lambda: load_symbol("os.path:join"),
+        "load_symbol_cached": lambda: load_symbol_cached("os.path:join"),
+        "load_variables": lambda: load_variables(context),
+        "VariableScope()": lambda: scope(),
+    }
+    for name, func in cases.items():
+        seconds = timeit.timeit(func, number=number)
+        print("{:<24}{:>10.3f} us/call".format(name, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
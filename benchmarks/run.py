@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""
+Benchmark suite of volkanic hot paths, with baselines to compare against.
+
+    python benchmarks/run.py                  # run and print
+    python benchmarks/run.py --save           # store as the baseline
+    python benchmarks/run.py --compare        # flag slowdowns vs. baseline
+    python benchmarks/run.py -k conf razor    # only cases matching
+
+Baselines are stored per Python version and machine under
+benchmarks/baselines/, since timings of different hosts do not compare;
+for the same reason they are not committed: run --save on your host first.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_here))
+
+from volkanic import introspect, utils  # noqa: E402
+from volkanic.cmdline import CommandOptionDict  # noqa: E402
+from volkanic.compat import cached_property  # noqa: E402
+from volkanic.environ import GlobalInterface, Singleton  # noqa: E402
+
+cases = {}
+
+
+def case(name):
+    def _decorator(func):
+        cases[name] = func
+        return func
+
+    return _decorator
+
+
+def _timeit(func, repeat=5) -> float:
+    """Best time per call in seconds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+@case("import volkanic")
+def bench_import():
+    def _run(code):
+        cmd = [sys.executable, "-c", code]
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(_here))
+        return subprocess.run(cmd, env=env, check=True)
+
+    base = min(timeit.repeat(lambda: _run("pass"), number=1, repeat=5))
+    full = min(timeit.repeat(lambda: _run("import volkanic"), number=1, repeat=5))
+    return max(full - base, 0.0)
+
+
+def _make_conf_gi(path: str):
+    class _GI(GlobalInterface):
+        package_name = "volkanic"
+
+        @classmethod
+        def _get_conf_paths(cls):
+            return [path]
+
+    return _GI
+
+
+def _bench_conf(ext: str, size: int):
+    if ext == ".json5":
+        try:
+            import json5  # noqa: F401
+        except ImportError:
+            return
+    conf = {"key{}".format(i): {"value": i, "list": [i] * 5} for i in range(size)}
+    with tempfile.TemporaryDirectory() as dirpath:
+        path = os.path.join(dirpath, "config" + ext)
+        with open(path, "w") as fout:
+            json.dump(conf, fout, indent=4)
+        gi = _make_conf_gi(path)()
+        # the conf cached_property, uncached
+        func = GlobalInterface.__dict__["conf"].func
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stderr(devnull):
+                return _timeit(lambda: func(gi))
+
+
+for _ext in [".json", ".json5"]:
+    for _label, _size in [("small", 10), ("large", 5000)]:
+        case("GlobalInterface.conf, {} {}".format(_label, _ext))(
+            lambda e=_ext, n=_size: _bench_conf(e, n)
+        )
+
+
+class _S(Singleton):
+    pass
+
+
+@case("SingletonMeta access")
+def bench_singleton():
+    _S()
+    return _timeit(_S)
+
+
+_payload = {
+    "items": [{"id": i, "text": "x" * 600, "tags": list(range(20))} for i in range(50)],
+    "meta": {"nested": {"deeper": {"deepest": {"value": 1}}}},
+}
+
+
+@case("razor")
+def bench_razor():
+    return _timeit(lambda: introspect.razor(_payload))
+
+
+class _Obj:
+    def __init__(self):
+        self.payload = _payload
+        self.name = "obj"
+
+
+@case("inspect_object")
+def bench_inspect_object():
+    obj = _Obj()
+    return _timeit(lambda: introspect.inspect_object(obj))
+
+
+def _make_error_info():
+    try:
+        raise ValueError("benchmark")
+    except ValueError:
+        return introspect.ErrorInfo()
+
+
+@case("ErrorInfo construction")
+def bench_error_info():
+    return _timeit(_make_error_info)
+
+
+@case("ErrorInfo.error_key")
+def bench_error_key():
+    return _timeit(lambda: _make_error_info().error_key)
+
+
+@case("load_symbol")
+def bench_load_symbol():
+    return _timeit(lambda: utils.load_symbol("os.path:join"))
+
+
+@case("load_symbol_cached")
+def bench_load_symbol_cached():
+    return _timeit(lambda: utils.load_symbol_cached("os.path:join"))
+
+
+@case("CommandOptionDict.as_args")
+def bench_as_args():
+    cod = CommandOptionDict([("-a", 1), ("-b", True), ("-c", ("x", ("y", "z")))])
+    cod("prog", "p1", "p2")
+    return _timeit(cod.as_args)
+
+
+class _Props:
+    @cached_property
+    def cp(self):
+        return 1
+
+    @utils.per_process_cached_property
+    def ppcp(self):
+        return 1
+
+    @utils.per_thread_cached_property
+    def ptcp(self):
+        return 1
+
+    @utils.ttl_cached_property(3600)
+    def ttlcp(self):
+        return 1
+
+    @utils.cached_method
+    def cm(self, x):
+        return x
+
+
+_props = _Props()
+
+
+@case("cached_property")
+def bench_cached_property():
+    return _timeit(lambda: _props.cp)
+
+
+@case("per_process_cached_property")
+def bench_per_process_cached_property():
+    return _timeit(lambda: _props.ppcp)
+
+
+@case("per_thread_cached_property")
+def bench_per_thread_cached_property():
+    return _timeit(lambda: _props.ptcp)
+
+
+@case("ttl_cached_property")
+def bench_ttl_cached_property():
+    return _timeit(lambda: _props.ttlcp)
+
+
+@case("cached_method")
+def bench_cached_method():
+    return _timeit(lambda: _props.cm(1))
+
+
+def get_baseline_path() -> str:
+    key = "{}-{}-{}".format(
+        platform.python_implementation().lower(),
+        "{}.{}".format(*sys.version_info[:2]),
+        platform.node() or "unknown",
+    )
+    return os.path.join(_here, "baselines", key + ".json")
+
+
+def run(keywords=None) -> dict:
+    results = {}
+    for name, func in cases.items():
+        if keywords and not any(k in name for k in keywords):
+            continue
+        seconds = func()
+        if seconds is None:
+            print("{:<40}{:>14}".format(name, "skipped"))
+            continue
+        results[name] = seconds
+        print("{:<40}{:>11.3f} us".format(name, seconds * 1e6))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns: names of cases slower than `threshold` times the baseline"""
+    slower = []
+    print()
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = seconds / base
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            slower.append(name)
+        print("{:<40}{:>9.2f}x{}".format(name, ratio, flag))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", "--keywords", nargs="*", help="only matching cases")
+    parser.add_argument("--baseline", default=get_baseline_path())
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument("--compare", action="store_true", help="compare to baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25, help="ratio flagged as slowdown"
+    )
+    ns = parser.parse_args()
+    baseline = None
+    if ns.compare:
+        if not os.path.isfile(ns.baseline):
+            msg = (
+                "no baseline at {}\n"
+                "run with --save on this host first, or pick one with --baseline\n"
+            )
+            parser.exit(2, msg.format(ns.baseline))
+        with open(ns.baseline) as fin:
+            baseline = json.load(fin)
+    results = run(ns.keywords)
+    if baseline is not None:
+        if compare(results, baseline, ns.threshold):
+            sys.exit(1)
+    if ns.save:
+        os.makedirs(os.path.dirname(ns.baseline), exist_ok=True)
+        if os.path.isfile(ns.baseline):
+            with open(ns.baseline) as fin:
+                results = dict(json.load(fin), **results)
+        with open(ns.baseline, "w") as fout:
+            json.dump(results, fout, indent=4, sort_keys=True)
+        print("\nbaseline saved:", ns.baseline)
+
+
+if __name__ == "__main__":
+    main()
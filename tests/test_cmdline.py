@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import io
+import sys
+import threading
+import time
+
+from volkanic import cmdline
+from volkanic.cmdline import CommandRegistry
+
+_calls = []
+_reported = threading.Event()
+
+
+def _cmd_ok(prog, args):
+    _calls.append((prog, args))
+
+
+def _cmd_exit(_, args):
+    sys.exit(int(args[0]))
+
+
+def _cmd_fail(*_):
+    raise RuntimeError("failed as expected")
+
+
+def _cmd_return(_, args):
+    return int(args[0]) if args[0].isdigit() else args[0]
+
+
+def _cmd_missing_key(*_):
+    return {}["missing"]
+
+
+def _cmd_wait(*_):
+    # the record of an earlier line is printed before this line finishes
+    if not _reported.wait(5):
+        raise RuntimeError("earlier records held back")
+
+
+def _get_registry():
+    commands = {
+        "ok": __name__ + ":_cmd_ok",
+        "exit": __name__ + ":_cmd_exit",
+        "fail": __name__ + ":_cmd_fail",
+        "return": __name__ + ":_cmd_return",
+        "missing_key": __name__ + ":_cmd_missing_key",
+        "wait": __name__ + ":_cmd_wait",
+    }
+    return CommandRegistry(commands, prog="demo")
+
+
+def test_run_batch(capsys):
+    registry = _get_registry()
+    lines = ["ok a 'b c'", "", "# comment", "exit 0"]
+    assert registry.run_batch(lines) == 0
+    assert _calls[-1] == ("demo ok", ["a", "b c"])
+    records = capsys.readouterr().err.splitlines()
+    assert [r.split("\t")[:2] for r in records] == [["1", "0"], ["4", "0"]]
+
+    lines = ["fail", "exit 3", "nonexistent", "ok x"] * 5
+    assert registry.run_batch(lines, workers=4) == 1
+    records = capsys.readouterr().err.splitlines()
+    records = [r.split("\t") for r in records if r[:1].isdigit()]
+    assert [r[1] for r in records] == ["1", "3", "1", "0"] * 5
+    assert [r[3] for r in records] == lines
+
+    assert registry.run_batch(["missing_key", "'unbalanced"]) == 1
+    err = capsys.readouterr().err
+    assert "KeyError: 'missing'" in err
+    assert "invalid command line: 'unbalanced" in err
+
+
+def test_run_batch_return_values(capsys):
+    registry = _get_registry()
+    assert registry.run_batch(["return 0", "return 2", "return oops"]) == 1
+    err = capsys.readouterr().err
+    records = [r.split("\t") for r in err.splitlines() if r[:1].isdigit()]
+    assert [r[1] for r in records] == ["0", "2", "1"]
+    assert "oops" in err
+
+
+def test_run_batch_pipe():
+    registry = _get_registry()
+    for workers in [0, 2]:
+        del _calls[:]
+
+        def _lines():
+            yield "ok first"
+            # the first line runs before the next one is read
+            for _ in range(500):
+                if _calls:
+                    break
+                time.sleep(0.01)
+            assert _calls, "lines held back until the end of input"
+            yield "ok second"
+
+        assert registry.run_batch(_lines(), workers=workers) == 0
+
+
+def test_run_batch_streaming(monkeypatch):
+    records = []
+
+    def _printerr(*args, **_):
+        records.append(args)
+        if args[0] == 1:
+            _reported.set()
+
+    monkeypatch.setattr(cmdline, "printerr", _printerr)
+    assert _get_registry().run_batch(["ok", "wait"], workers=2) == 0
+    assert [r[:2] for r in records] == [(1, 0), (2, 0)]
+
+
+def test_batch_argv(tmp_path, monkeypatch):
+    registry = _get_registry()
+    path = tmp_path / "batch.txt"
+    path.write_text("ok 1\nok 2\n")
+    try:
+        registry(["demo", "--batch", str(path), "-j", "2"])
+    except SystemExit as exc:
+        assert exc.code == 0
+    else:
+        raise AssertionError("SystemExit not raised")
+    monkeypatch.setattr(sys, "stdin", io.StringIO("exit 2\n"))
+    try:
+        registry(["demo", "--batch", "-"])
+    except SystemExit as exc:
+        assert exc.code == 1
+    else:
+        raise AssertionError("SystemExit not raised")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+import threading
+
+from volkanic.diskcache import DiskCache
+
+
+def test_disk_cache(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=4096, check_every=1)
+    assert cache.get("a") is None
+    cache.set("a", b"hello")
+    cache.set("empty", b"")
+    assert cache.get("a")[:] == b"hello"
+    assert cache.get("empty") == b""
+    cache.delete("a")
+    assert cache.get("a") is None
+    for i in range(20):
+        cache.set(str(i), os.urandom(1000))
+    assert cache.total_bytes() <= 4096
+    # the latest entries survive eviction
+    assert len(cache.get("19")) == 1000
+    # files outside shard dirs are not cache entries
+    other = tmp_path / "jinja2"
+    other.mkdir()
+    (other / "__jinja2_abc.cache").write_bytes(b"x" * 5000)
+    assert cache.total_bytes() <= 4096
+    cache.clear()
+    assert cache.total_bytes() == 0
+    assert (other / "__jinja2_abc.cache").exists()
+
+
+def test_disk_cache_threads(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    errors = []
+
+    def _set():
+        try:
+            for i in range(100):
+                cache.set("k", str(i).encode())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_set) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert cache.get("k")[:] == b"99"
+
+
+def test_memoize(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    calls = []
+
+    @cache.memoize
+    def add(a, b=0):
+        calls.append((a, b))
+        return {"sum": a + b}
+
+    assert add(1, b=2) == {"sum": 3}
+    assert add(1, b=2) == {"sum": 3}
+    assert add(2) == {"sum": 2}
+    assert calls == [(1, 2), (2, 0)]
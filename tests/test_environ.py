@@ -3,7 +3,7 @@
 
 import volkanic
 from volkanic import utils
-from volkanic.environ import GlobalInterfaceTrial
+from volkanic.environ import GlobalInterfaceTrial, KeyedInstance, WeakKeyedInstance
 
 
 class GlobalInterface(GlobalInterfaceTrial):
@@ -78,3 +78,76 @@ def test_under_dir():
     _eq(volk_gi.under_package_dir("a", "b"), volk_gi.under_package_dir("a/b"))
     _eq(volk_gi.under_package_dir(), utils.under_parent_dir(volkanic.__file__))
     _eq(test_gi.under_data_dir(), "/data/local/volkanic")
+
+
+def test_options():
+    class GI2(GlobalInterface):
+        package_name = "hello_world.demo2"
+        project_name = "custom-name"
+        _options = {"confpath_filename": "demo.json5", "extra": 1}
+
+    class GI3(GI2):
+        package_name = "hello_world.demo3"
+        _options = {"extra": 2}
+
+    _eq(GI2._get_option("confpath_filename"), "demo.json5")
+    _eq(GI3._get_option("confpath_filename"), "demo.json5")
+    _eq(GI3._get_option("project_source_depth"), 0)
+    _eq(GI3._get_option("extra"), 2)
+    _eq(GI3._get_option("nonexistent"), None)
+    _eq(GI3.project_name, "custom-name")
+    _eq(GI3.identifier, "hello_world_demo3")
+    _eq(GI3._fmt_envvar_name("loglevel"), "HELLO_WORLD_DEMO3_LOGLEVEL")
+    _eq(GI3._get_conf_path_names(), ["custom-name", "demo.json5"])
+
+
+def test_keyed_instances():
+    closed = []
+
+    class Tenant(KeyedInstance):
+        max_instances = 3
+
+        def __init__(self, key, dsn=None):
+            self.key = key
+            self.dsn = dsn
+
+        def on_evicted(self):
+            closed.append(self.key)
+
+    class WeakTenant(WeakKeyedInstance):
+        def __init__(self, key):
+            self.key = key
+
+    a = Tenant("a", dsn="x")
+    assert Tenant("a") is a
+    assert a.dsn == "x"
+    Tenant("b")
+    Tenant("c")
+    Tenant("a")
+    Tenant("d")
+    _eq(closed, ["b"])
+    _eq(Tenant.count_instances(), 3)
+    assert Tenant.evict_instance("c")
+    assert not Tenant.evict_instance("c")
+    _eq(closed, ["b", "c"])
+    Tenant.clear_instances()
+    _eq(sorted(closed), ["a", "b", "c", "d"])
+    _eq(Tenant.count_instances(), 0)
+
+    class BadTenant(KeyedInstance):
+        def __init__(self, key):
+            raise ValueError(key)
+
+    for i in range(100):
+        try:
+            BadTenant(i)
+        except ValueError:
+            pass
+    _eq(BadTenant.count_instances(), 0)
+    _eq(BadTenant._keyed_creation_locks, {})
+
+    w = WeakTenant("w")
+    assert WeakTenant("w") is w
+    _eq(WeakTenant.count_instances(), 1)
+    del w
+    _eq(WeakTenant.count_instances(), 0)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
+import os
+
 from volkanic import introspect
 from volkanic.introspect import ErrorBase
 
@@ -24,5 +26,134 @@ def test_errorbase():
     assert ErrorBase.from_dict(d).to_dict() == d
 
 
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def test_find_all_plain_modules(tmp_path):
+    for relpath in [
+        "pkg/__init__.py",
+        "pkg/mod.py",
+        "pkg/sub/__init__.py",
+        "pkg/sub/deep.py",
+        "pkg/data/loose.py",
+        "pkg/bad-name/x.py",
+        ".git/hooks/x.py",
+        "node_modules/a/b.py",
+        "venv/pyvenv.cfg",
+        "venv/lib/site.py",
+        "top.py",
+    ]:
+        _touch(os.path.join(tmp_path, relpath))
+    expected = {"pkg", "pkg.mod", "pkg.sub", "pkg.sub.deep", "pkg.data.loose", "top"}
+    find = introspect.find_all_plain_modules
+    assert set(find(str(tmp_path))) == expected
+    assert set(find(str(tmp_path), workers=4)) == expected
+    names = set(find(str(tmp_path), packages_only=True))
+    assert names == expected - {"pkg.data.loose"}
+
+    index_path = os.path.join(tmp_path, ".index.json")
+    assert set(find(str(tmp_path), index_path=index_path)) == expected
+    assert os.path.isfile(index_path)
+    assert set(find(str(tmp_path), index_path=index_path)) == expected
+    _touch(os.path.join(tmp_path, "pkg/sub/new.py"))
+    names = set(find(str(tmp_path), index_path=index_path))
+    assert names == expected | {"pkg.sub.new"}
+
+
+def test_find_modules_symlinks(tmp_path):
+    for relpath in ["src/linked/__init__.py", "src/linked/mod.py"]:
+        _touch(os.path.join(tmp_path, relpath))
+    root = os.path.join(tmp_path, "root")
+    os.makedirs(os.path.join(root, "pkg"))
+    _touch(os.path.join(root, "pkg", "__init__.py"))
+    os.symlink(os.path.join(tmp_path, "src", "linked"), os.path.join(root, "linked"))
+    # cycles are followed once at most
+    os.symlink(root, os.path.join(root, "pkg", "loop"))
+    os.symlink(os.path.join(root, "pkg"), os.path.join(root, "linked", "back"))
+    names = set(introspect.find_all_plain_modules(root))
+    assert names == {"pkg", "linked", "linked.mod", "linked.back"}
+
+
+def test_import_all_modules(tmp_path, monkeypatch):
+    pkg_dir = os.path.join(tmp_path, "volk_bulk_pkg")
+    _touch(os.path.join(pkg_dir, "__init__.py"))
+    with open(os.path.join(pkg_dir, "good.py"), "w") as fout:
+        fout.write("VALUE = 42\n")
+    with open(os.path.join(pkg_dir, "bad.py"), "w") as fout:
+        fout.write("raise RuntimeError('bad module')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    dotpaths = list(introspect.find_all_plain_modules(str(tmp_path)))
+    dotpaths.append("volk_bulk_pkg.good:VALUE")
+
+    warmed = introspect.warm_pycache(dotpaths, [str(tmp_path)])
+    assert warmed["volk_bulk_pkg.good"] is True
+    warmed = introspect.warm_pycache(dotpaths, [str(tmp_path)])
+    assert warmed["volk_bulk_pkg.good"] is False
+
+    report = introspect.import_all_modules(dotpaths, [str(tmp_path)])
+    assert set(report.durations) == set(dotpaths)
+    assert list(report.failures) == ["volk_bulk_pkg.bad"]
+    assert report.symbols == {"volk_bulk_pkg.good:VALUE": 42}
+    report = introspect.import_all_modules(dotpaths, precompile=False)
+    assert list(report.skipped) == ["volk_bulk_pkg.bad"]
+
+
+class _Record:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def test_compiled_queries():
+    objects = [
+        {"a": {"b": [{"c": 1}, {"c": 2}]}, "x": "x"},
+        {"a": {"b": []}},
+        {"a": _Record(b=[_Record(c=3)])},
+        {"a": {"keys": 1, "b": {"0": {"c": 4}}}},
+        {"a": "str-stops-here"},
+        [{"b": 1}],
+        None,
+    ]
+    dotpaths = ["a.b.0.c", "a.b.1.c", "a.keys", "a.b", "x", "0.b", "a.x.y"]
+    multi_query = introspect.MultiQuery(dotpaths)
+    for dotpath in dotpaths:
+        query = introspect.compile_query(dotpath)
+        expected = [introspect.query_object(obj, dotpath) for obj in objects]
+        assert query.map(objects) == expected, dotpath
+    for obj in objects:
+        expected = [introspect.query_object(obj, dp) for dp in dotpaths]
+        assert multi_query(obj) == expected, obj
+
+
+def test_extract_columns():
+    import array
+    import math
+
+    objects = [
+        {"id": 1, "score": 1, "user": {"name": "a"}},
+        {"id": 2, "user": {}},
+        {"id": 3, "score": 2, "user": {"name": "c"}},
+    ]
+    dotpaths = ["id", "score", "user.name"]
+    columns = introspect.extract_columns(
+        objects, dotpaths, typecodes={"id": "q", "score": "d"}
+    )
+    assert columns["id"] == array.array("q", [1, 2, 3])
+    assert columns["user.name"] == ["a", None, "c"]
+    assert columns["score"][0] == 1.0
+    assert math.isnan(columns["score"][1])
+    try:
+        introspect.extract_columns(objects, ["score"], typecodes={"score": "q"})
+    except ValueError as e:
+        print("ValueError raised as expected:", e)
+    else:
+        raise RuntimeError("missing integer not reported")
+    columns = introspect.extract_columns(
+        objects, ["score"], typecodes={"score": "q"}, fills={"score": -1}
+    )
+    assert columns["score"] == array.array("q", [1, -1, 2])
+
+
 if __name__ == "__main__":
     test_path_formatters()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import io
+import json
+
+from volkanic import jsonio
+from volkanic.utils import indented_json_dumpb, indented_json_dumps, json_default
+
+records = [
+    {"id": 1, "name": "a\nb", "tags": ["x", {"y": [1, 2.5e10]}]},
+    {"id": 12345678901234567890, "flag": True, "none": None},
+    "text with ] and , inside",
+    -0.25,
+    [],
+    {},
+]
+
+
+def test_json_array_roundtrip():
+    buf = io.StringIO()
+    assert jsonio.write_json_array(records, buf) == len(records)
+    text = buf.getvalue()
+    assert text == indented_json_dumps(records) + "\n"
+    for chunk_size in [1, 3, 7, 4096]:
+        fin = io.StringIO(text)
+        loaded = list(jsonio.iter_json_array(fin, chunk_size=chunk_size))
+        assert loaded == records, chunk_size
+    batches = list(jsonio.iter_json_array(io.StringIO(text), batch_size=4))
+    assert batches == [records[:4], records[4:]]
+    assert list(jsonio.iter_json_array(io.StringIO(" [ ] "))) == []
+    buf = io.StringIO()
+    jsonio.write_json_array([], buf)
+    assert json.loads(buf.getvalue()) == []
+    for indent in [None, 0]:
+        buf = io.StringIO()
+        jsonio.write_json_array(records[:3], buf, indent=indent)
+        assert json.loads(buf.getvalue()) == records[:3]
+
+
+def test_json_array_numbers():
+    for chunk_size in range(1, 12):
+        text = "[10.5, 2e3, 7, -1.25E-2]"
+        loaded = list(jsonio.iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+        assert loaded == [10.5, 2e3, 7, -1.25e-2], chunk_size
+    numbers = [i + 0.123456 for i in range(20000)]
+    text = json.dumps(numbers)
+    for chunk_size in [5, 4096]:
+        loaded = list(jsonio.iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+        assert loaded == numbers, chunk_size
+
+
+def test_json_array_malformed_early():
+    class Reader(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    fin = Reader("[1, {bad}, " + "2, " * 100000 + "3]")
+    try:
+        list(jsonio.iter_json_array(fin, chunk_size=64))
+    except json.JSONDecodeError:
+        print("JSONDecodeError raised as expected")
+    else:
+        raise AssertionError("JSONDecodeError not raised")
+    # the rest of the input is not buffered
+    assert fin.reads <= 2, fin.reads
+
+
+def test_json_array_errors():
+    for text in ["", "{}", "[1 2]", "[1,", "[1,]", "[tru]"]:
+        try:
+            list(jsonio.iter_json_array(io.StringIO(text), chunk_size=2))
+        except json.JSONDecodeError:
+            pass
+        else:
+            raise RuntimeError("error not raised: {!r}".format(text))
+
+
+def test_json_lines_roundtrip(tmp_path):
+    path = str(tmp_path / "records.jsonl")
+    assert jsonio.write_json_lines(records, path) == len(records)
+    assert list(jsonio.iter_json_lines(path)) == records
+    batches = list(jsonio.iter_json_lines(path, batch_size=5))
+    assert batches == [records[:5], records[5:]]
+
+
+class _WithJSON:
+    def __json__(self):
+        return {"json": True}
+
+
+class _Slotted:
+    __slots__ = []
+
+    def __str__(self):
+        return "slotted"
+
+
+class _Plain:
+    pass
+
+
+def test_json_default():
+    import datetime
+    import decimal
+    import uuid
+
+    obj = _WithJSON()
+    assert json_default(obj) == {"json": True}
+    obj = _Slotted()
+    assert json_default(obj) == "slotted"
+    dt = datetime.datetime(2020, 1, 2, 3, 4, 5)
+    assert json_default(dt) == str(dt)
+    assert json_default(decimal.Decimal("1.5")) == "1.5"
+    u = uuid.uuid4()
+    assert json_default(u) == str(u)
+    plain = _Plain()
+    plain.__json__ = lambda: "instance-level"
+    assert json_default(plain) == "instance-level"
+
+
+def test_json_backends():
+    import datetime
+    import importlib.util
+
+    payload = {"b": [1, 2.5, None, "é"], "a": {"when": datetime.date(2020, 1, 2)}}
+    expected = json.loads(indented_json_dumps(payload))
+    for name in ["json", "ujson", "orjson", "auto"]:
+        if name != "auto" and importlib.util.find_spec(name) is None:
+            continue
+        backend = jsonio.get_json_backend(name)
+        text = indented_json_dumps(payload, dumps=backend.dumps)
+        assert json.loads(text) == expected, name
+        data = backend.dumpb(payload, default=json_default, sort_keys=True)
+        assert json.loads(data) == expected, name
+    jsonio.set_json_backend("auto")
+    try:
+        assert json.loads(indented_json_dumpb(payload)) == expected
+    finally:
+        jsonio.set_json_backend("json")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import io
+import json
+import logging
+
+from volkanic.logs import (
+    BoundedQueueHandler,
+    JSONLinesFormatter,
+    setup_queued_logging,
+)
+
+
+def test_json_lines_formatter():
+    logger = logging.getLogger("volkanic.test_logs")
+    record = logger.makeRecord(
+        logger.name, logging.INFO, __file__, 1, "hello %s", ("world",), None
+    )
+    data = json.loads(JSONLinesFormatter().format(record))
+    assert data["message"] == "hello world"
+    assert data["levelname"] == "INFO"
+
+
+def test_bounded_queue_handler():
+    handler = BoundedQueueHandler(maxsize=2)
+    logger = logging.Logger("volkanic.test_logs.bounded")
+    logger.addHandler(handler)
+    for i in range(5):
+        logger.warning("message %s", i)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_setup_queued_logging():
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JSONLinesFormatter())
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    level = root.level
+    listener = setup_queued_logging([target], "INFO")
+    try:
+        logging.getLogger("volkanic.test_logs").info("queued %d", 1)
+    finally:
+        listener.stop()
+        root.handlers = handlers
+        root.setLevel(level)
+    assert json.loads(stream.getvalue())["message"] == "queued 1"
+
+
+def test_setup_logging_configured(tmp_path):
+    from volkanic.environ import GlobalInterface
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    existing = logging.NullHandler()
+    root.addHandler(existing)
+    path = tmp_path / "a.log"
+    try:
+        for queued in [False, True]:
+            GlobalInterface.setup_logging(queued=queued, filename=str(path))
+            assert root.handlers == handlers + [existing]
+    finally:
+        root.handlers = handlers
+    assert not path.exists()
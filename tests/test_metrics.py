@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from volkanic import metrics
+from volkanic.metrics import MetricRegistry
+
+
+def test_bucket_bounds():
+    for ns in [0, 1, 15, 16, 17, 100, 12345, 10**9, 2**62]:
+        low, high = metrics._bucket_bounds(metrics._bucket_index(ns))
+        assert low <= ns <= high, (ns, low, high)
+        assert high - low <= low / 8, (ns, low, high)
+
+
+def test_timed():
+    registry = MetricRegistry()
+
+    @registry.timed
+    def square(x):
+        return x * x
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert sum(executor.map(square, range(1000))) == 332833500
+    with registry.timer("block"):
+        square(3)
+    snapshot = registry.snapshot()
+    name = square.__module__ + ".test_timed.<locals>.square"
+    assert set(snapshot) == {name, "block"}, snapshot
+    assert snapshot[name]["count"] == 1001
+    assert 0 < snapshot[name]["p50_ns"] <= snapshot[name]["max_ns"]
+    assert registry.snapshot("block")["block"]["count"] == 1
+    registry.reset()
+    assert registry.snapshot()[name]["count"] == 0
+
+
+def test_retired_shards():
+    registry = MetricRegistry()
+    square = registry.timed(lambda x: x * x, name="square")
+    for _ in range(20):
+        thread = threading.Thread(target=lambda: [square(i) for i in range(10)])
+        thread.start()
+        thread.join()
+    metric = registry.get("square")
+    # shards of finished threads are folded, not kept
+    assert len(metric._shards) <= 1
+    assert registry.snapshot()["square"]["count"] == 200
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+import time
+
+from volkanic.profiling import SamplingProfiler
+
+
+def _busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def test_sampling_profiler(tmp_path):
+    with SamplingProfiler(interval=0.001) as profiler:
+        _busy_loop(0.2)
+    assert not profiler.running
+    assert profiler.sample_count > 0
+    assert any("test_profiling._busy_loop" in k for k in profiler.counts)
+    path = profiler.dump(os.path.join(tmp_path, "x.collapsed"))
+    with open(path) as fin:
+        for line in fin:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+
+from volkanic import resources
+
+
+def test_map_file(tmp_path):
+    path = os.path.join(tmp_path, "table.bin")
+    with open(path, "wb") as fout:
+        fout.write(b"0123456789")
+    view = resources.map_file(path)
+    assert view.readonly
+    assert bytes(view[2:5]) == b"234"
+    assert resources.map_file(path) is view
+    assert path in resources.mapped_files()
+    resources.unmap_file(path)
+    assert resources.map_file(path) is not view
+    empty_path = os.path.join(tmp_path, "empty.bin")
+    open(empty_path, "wb").close()
+    assert len(resources.map_file(empty_path)) == 0
+
+
+def test_lookup_table(tmp_path):
+    path = os.path.join(tmp_path, "table.vlkt")
+    items = {"k{}".format(i): "value-{}".format(i) for i in range(1000)}
+    items[""] = ""
+    items["ключ"] = "значение"
+    resources.build_lookup_table(path, items.items())
+    table = resources.LookupTable(path)
+    assert len(table) == len(items)
+    for k, v in items.items():
+        assert table[k] == v.encode("utf-8")
+    assert "k1000" not in table
+    assert table.get("k1000", b"-") == b"-"
+    assert bytes(table.get_view("k7")) == b"value-7"
+    assert list(table.keys()) == sorted(k.encode("utf-8") for k in items)
+    try:
+        resources.build_lookup_table(path, [("a", "1"), ("a", "2")])
+    except ValueError as e:
+        print("ValueError raised as expected:", e)
+    else:
+        raise RuntimeError("duplicate key not reported")
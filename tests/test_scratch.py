@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+import time
+
+from volkanic.scratch import ScratchSpace
+
+
+def test_scratch_space(tmp_path):
+    scratch = ScratchSpace(str(tmp_path), shard_count=4, max_age=60)
+    paths = {scratch.path(".txt") for _ in range(50)}
+    assert len(paths) == 50
+    assert len(os.listdir(tmp_path)) <= 4
+    with scratch.file(".bin") as fout:
+        fout.write(b"abc")
+        path = fout.name
+        assert os.path.isfile(path)
+    assert not os.path.exists(path)
+    with scratch.directory() as dirpath:
+        open(os.path.join(dirpath, "x"), "w").close()
+    assert not os.path.exists(dirpath)
+    with scratch.memory_file(max_size=64) as fileobj:
+        fileobj.write(b"abc")
+        fileobj.seek(0)
+        assert fileobj.read() == b"abc"
+        assert not fileobj._rolled
+        fileobj.write(b"x" * 100)
+        assert fileobj._rolled
+
+
+def test_scratch_shard_removed(tmp_path):
+    import shutil
+
+    scratch = ScratchSpace(str(tmp_path), shard_count=1)
+    with scratch.directory() as dirpath:
+        pass
+    shutil.rmtree(os.path.dirname(dirpath))
+    with scratch.directory() as dirpath:
+        assert os.path.isdir(dirpath)
+    with scratch.file() as fout:
+        assert os.path.isfile(fout.name)
+
+
+def test_scratch_cleanup(tmp_path):
+    scratch = ScratchSpace(str(tmp_path), max_age=60, quota_bytes=2500)
+    old = time.time() - 120
+    for i in range(5):
+        with scratch.file(keep=True) as fout:
+            fout.write(b"x" * 1000)
+        if i < 2:
+            os.utime(fout.name, (old, old))
+    assert scratch.cleanup() == 3
+    sizes = [e[1] for e in scratch._iter_entries() if not e[3]]
+    assert sum(sizes) <= 2500
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import multiprocessing
+
+from volkanic.environ import GlobalInterfaceTrial
+from volkanic.sharedconf import SharedConf, attach_conf, pack_conf, publish_conf
+
+
+class GlobalInterface(GlobalInterfaceTrial):
+    package_name = "volkanic.sharedconf"
+
+
+_conf = {
+    "name": "demo",
+    "db": {"host": "localhost", "ports": [5432, 5433]},
+    "tags": {"a", "b"},
+    "ratio": 0.5,
+    "nothing": None,
+    "klass": GlobalInterface,
+}
+
+
+def _read_attached(name: str):
+    conf = attach_conf(name)
+    try:
+        return sorted(conf), conf["db"], conf["tags"]
+    finally:
+        conf.close()
+
+
+def _read_gi(key: str):
+    return GlobalInterface().conf[key]
+
+
+def test_pack_conf():
+    conf = SharedConf(pack_conf(_conf))
+    assert len(conf) == len(_conf)
+    assert "db" in conf and "x" not in conf
+    assert conf.get("x") is None
+    assert conf["db"] is conf["db"]
+    assert dict(conf) == _conf
+    packed = pack_conf(_conf)
+    for data in [b"x" * 64, b"VCNF", packed[:30], packed[:-1]]:
+        try:
+            SharedConf(data)
+        except ValueError:
+            print("ValueError raised as expected")
+        else:
+            raise AssertionError("ValueError not raised")
+
+
+def test_shared_conf_workers():
+    segment, conf = publish_conf({k: v for k, v in _conf.items() if k != "klass"})
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(4) as pool:
+            results = pool.map(_read_attached, [segment.name] * 8)
+        for keys, db, tags in results:
+            assert keys == sorted(conf)
+            assert db == _conf["db"]
+            assert tags == _conf["tags"]
+        # workers must not unlink the segment when they exit
+        attached = attach_conf(segment.name)
+        assert attached["name"] == "demo"
+        attached.close()
+    finally:
+        conf.close(unlink=True)
+
+
+def test_gi_share_conf(monkeypatch):
+    gi = GlobalInterface()
+    envvar_name = GlobalInterface._fmt_envvar_name("shared_conf")
+    monkeypatch.delenv(envvar_name, raising=False)
+    monkeypatch.setitem(gi.__dict__, "conf", {"db": _conf["db"], "x": 1})
+    conf = gi.share_conf()
+    try:
+        assert isinstance(gi.conf, SharedConf)
+        assert gi.share_conf() is conf
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(2) as pool:
+            assert pool.map(_read_gi, ["x", "db"]) == [1, _conf["db"]]
+    finally:
+        conf.close(unlink=True)
+
+
+def test_gi_stale_shared_conf(monkeypatch):
+    class GI(GlobalInterfaceTrial):
+        package_name = "volkanic.sharedconf.stale"
+        default_config = {"x": 2}
+
+        @classmethod
+        def _locate_conf(cls):
+            return
+
+    monkeypatch.setenv(GI._fmt_envvar_name("shared_conf"), "no_such_segment")
+    assert dict(GI().conf) == {"x": 2}
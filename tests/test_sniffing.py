@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import gzip
+import io
+import os
+import wave
+import zipfile
+
+from volkanic import sniffing, utils
+
+
+def _zip_bytes(names, first=None):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        if first:
+            zf.writestr(zipfile.ZipInfo(first[0]), first[1])
+        for name in names:
+            zf.writestr(name, "x" * 100)
+    return buf.getvalue()
+
+
+def _wav_bytes():
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\x00\x00" * 10)
+    return buf.getvalue()
+
+
+samples = {
+    b"%PDF-1.7\n...": "application/pdf",
+    b"\xFF\xD8\xFF\xE1\x00\x10Exif": "image/jpeg",
+    b"GIF89a\x01\x00": "image/gif",
+    b"RIFF\x24\x00\x00\x00WEBPVP8 ": "image/webp",
+    b"\x00\x00\x00\x18ftypmp42\x00\x00": "video/mp4",
+    b"\x00\x00\x00\x18ftypqt  \x00\x00": "video/quicktime",
+    gzip.compress(b"hello"): "application/gzip",
+    _wav_bytes(): "audio/wav",
+    _zip_bytes(["a.txt"]): "application/zip",
+    _zip_bytes(["[Content_Types].xml", "xl/workbook.xml"]): (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    ),
+    _zip_bytes(
+        ["content.xml"], first=("mimetype", "application/vnd.oasis.opendocument.text")
+    ): "application/vnd.oasis.opendocument.text",
+    b'  {"a": 1}': "application/json",
+    b"\xEF\xBB\xBF[1, 2]": "application/json",
+    b"<!DOCTYPE html><html>": "text/html",
+    b'<?xml version="1.0"?><svg>': "image/svg+xml",
+    "plain text, ünïcode".encode("utf-8"): "text/plain",
+    b"BM\x46\x00\x00\x00\x00\x00\x00\x00\x36\x00\x00\x00\x28\x00\x00\x00": "image/bmp",
+    b"BMW 320i, 2019\n": "text/plain",
+    b"\x00\x01\x02\x03": None,
+    b"": None,
+}
+
+
+def test_sniff():
+    for content, expected in samples.items():
+        assert sniffing.sniff(content) == expected, (content[:40], expected)
+        assert sniffing.sniff_stream(io.BytesIO(content)) == expected
+
+
+def test_guess_content_type():
+    assert utils.guess_content_type(b"\x89PNG\r\n\x1a\n....") == "image/png"
+    assert utils.guess_content_type(b'{"a": 1}') is None
+    assert utils.guess_content_type(b"BMW 320i, 2019\n") is None
+    assert utils.guess_content_type(b'{"a": 1}', text=True) == "application/json"
+
+
+def test_sniff_tree(tmp_path):
+    expected = {}
+    for ix, (content, content_type) in enumerate(samples.items()):
+        path = os.path.join(tmp_path, str(ix % 3), "f{}".format(ix))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fout:
+            fout.write(content)
+        expected[path] = content_type
+    assert dict(sniffing.sniff_tree(str(tmp_path), workers=2)) == expected
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+
+import pytest
+
+from volkanic.templating import build_jinja2_env, precompile_templates
+
+
+def test_jinja2_env(tmp_path):
+    pytest.importorskip("jinja2")
+    templates_dir = os.path.join(tmp_path, "templates")
+    cache_dir = os.path.join(tmp_path, "cache")
+    os.makedirs(templates_dir)
+    os.makedirs(cache_dir)
+    with open(os.path.join(templates_dir, "hello.txt"), "w") as fout:
+        fout.write("hello {{ name }}")
+    env = build_jinja2_env({"autoescape": False}, [templates_dir], cache_dir)
+    assert precompile_templates(env) == ["hello.txt"]
+    assert os.listdir(cache_dir)
+    env = build_jinja2_env({}, [templates_dir], cache_dir)
+    assert env.get_template("hello.txt").render(name="volk") == "hello volk"
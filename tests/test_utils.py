@@ -60,6 +60,187 @@ def test_cached_property():
     assert len(pvals) > 98, pvals
 
 
+def test_load_symbol_cached():
+    import os.path
+    import sys
+    import types
+
+    assert utils.load_symbol_cached("os.path:join") is os.path.join
+    assert utils.load_symbol_cached("os.path:join") is os.path.join
+    assert utils.load_symbol_cached("os.path") is os.path
+    mod = types.ModuleType("volk_tmp_mod")
+    mod.f = lambda: 1
+    sys.modules["volk_tmp_mod"] = mod
+    try:
+        f = utils.load_symbol_cached("volk_tmp_mod:f")
+        assert f() == 1
+        mod.f = lambda: 2
+        assert utils.load_symbol_cached("volk_tmp_mod:f")() == 2
+    finally:
+        sys.modules.pop("volk_tmp_mod")
+        utils.clear_symbol_cache("volk_tmp_mod")
+
+
+def test_variable_scope():
+    context = ["os.path:join", "json:dumps"]
+    scope = utils.VariableScope(context, {"dn": "os.path:dirname"})
+    expected = utils.load_variables(context, {"dn": "os.path:dirname"})
+    assert scope() == expected
+    assert scope() is not scope()
+    assert scope(x=1)["x"] == 1
+
+
+class Remote:
+    def __init__(self):
+        self.calls = 0
+
+    @utils.ttl_cached_property(0.05)
+    def metadata(self):
+        self.calls += 1
+        return self.calls
+
+    @utils.cached_method(maxsize=2)
+    def lookup(self, key, suffix=""):
+        self.calls += 1
+        return str(key) + suffix
+
+
+def test_ttl_cached_property():
+    import time
+
+    r = Remote()
+    assert r.metadata == 1
+    assert r.metadata == 1
+    time.sleep(0.06)
+    assert r.metadata == 2
+    del r.metadata
+    assert r.metadata == 3
+    assert Remote.metadata.stats.hits >= 1
+
+
+def test_cached_method():
+    r = Remote()
+    assert r.lookup(1) == "1"
+    assert r.lookup(1) == "1"
+    assert r.lookup(1, suffix="x") == "1x"
+    assert r.calls == 2
+    r.lookup(2)
+    assert r.lookup.cache_info()["size"] == 2
+    assert r.lookup(1) == "1"
+    assert r.calls == 4
+    assert Remote().lookup(1) == "1"
+    r.lookup.cache_clear()
+    assert r.lookup.cache_info()["size"] == 0
+
+    class Unbounded:
+        @utils.cached_method(maxsize=None)
+        def square(self, x):
+            return x * x
+
+    u = Unbounded()
+    assert [u.square(i) for i in range(300)][-1] == 299 * 299
+    assert u.square.cache_info()["size"] == 300
+
+
+class SlowRemote:
+    def __init__(self):
+        self.calls = 0
+
+    @utils.ttl_cached_property(0.01)
+    def metadata(self):
+        import time
+
+        self.calls += 1
+        time.sleep(0.05)
+        return self.calls
+
+
+def test_ttl_cached_property_stampede():
+    import time
+
+    r = SlowRemote()
+    assert r.metadata == 1
+    time.sleep(0.02)
+    with ThreadPoolExecutor(max_workers=8) as tx:
+        values = list(tx.map(getattr, [r] * 8, ["metadata"] * 8))
+    assert r.calls == 2
+    assert set(values) <= {1, 2}
+
+
+def test_abs_path_join_and_mkdirs(tmp_path):
+    import os
+    import shutil
+
+    root = str(tmp_path)
+    path = utils.abs_path_join_and_mkdirs(root, "a/b", "c.txt")
+    assert os.path.isdir(os.path.join(root, "a/b"))
+    shutil.rmtree(os.path.join(root, "a"))
+    # the directory is remembered, so it is not created again
+    utils.abs_path_join_and_mkdirs(root, "a/b", "c.txt")
+    assert not os.path.exists(os.path.join(root, "a/b"))
+    with utils.open_and_mkdirs(path) as fout:
+        fout.write("c")
+    assert os.path.isfile(path)
+    dirpaths = utils.prepare_dirs(root + "/x/y", root + "/x", root + "/z")
+    assert dirpaths == [root + "/x", root + "/x/y", root + "/z"]
+    assert all(os.path.isdir(p) for p in dirpaths)
+
+
+def test_where(tmp_path, monkeypatch):
+    import os
+    import sys
+
+    pkg_dir = os.path.join(tmp_path, "volk_where_pkg")
+    os.makedirs(pkg_dir)
+    for name in ["__init__.py", "mod.py"]:
+        with open(os.path.join(pkg_dir, name), "w") as fout:
+            fout.write("raise RuntimeError('must not be imported')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert utils.where("volk_where_pkg") == pkg_dir
+    assert utils.where("volk_where_pkg.mod") == os.path.join(pkg_dir, "mod.py")
+    assert "volk_where_pkg" not in sys.modules
+    assert utils.where("sys") == "NotAvailable"
+    results = utils.where_many(["volkanic", "volk_where_nonexistent"])
+    assert results["volkanic"] == utils.under_parent_dir(utils.__file__)
+    assert results["volk_where_nonexistent"] is None
+    try:
+        utils.where("volk_where_pkg.nonexistent")
+    except ModuleNotFoundError as e:
+        print("ModuleNotFoundError raised as expected:", e)
+    else:
+        raise RuntimeError("ModuleNotFoundError not raised")
+
+
+def test_where_meta_path_finder(tmp_path, monkeypatch):
+    import importlib.util
+    import os
+    import sys
+
+    # like the finders of setuptools editable installs
+    pkg_dir = os.path.join(tmp_path, "src", "volk_editable_pkg")
+    os.makedirs(pkg_dir)
+    for name in ["__init__.py", "mod.py"]:
+        with open(os.path.join(pkg_dir, name), "w") as fout:
+            fout.write("raise RuntimeError('must not be imported')\n")
+
+    class EditableFinder:
+        @staticmethod
+        def find_spec(fullname, path=None, target=None):
+            if fullname != "volk_editable_pkg":
+                return
+            return importlib.util.spec_from_file_location(
+                fullname,
+                os.path.join(pkg_dir, "__init__.py"),
+                submodule_search_locations=[pkg_dir],
+            )
+
+    monkeypatch.setattr(sys, "meta_path", sys.meta_path + [EditableFinder])
+    assert utils.where("volk_editable_pkg") == pkg_dir
+    path = os.path.join(pkg_dir, "mod.py")
+    assert utils.where("volk_editable_pkg.mod") == path
+    assert "volk_editable_pkg" not in sys.modules
+
+
 if __name__ == "__main__":
     test_hide_first_level_relpath()
     test_cached_property()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+import shutil
+
+from volkanic import writer as writer_module
+from volkanic.writer import BatchWriter, atomic_write
+
+
+def _read(path):
+    with open(path, "rb") as fin:
+        return fin.read()
+
+
+def test_atomic_write(tmp_path):
+    path = os.path.join(tmp_path, "a", "b.txt")
+    atomic_write(path, "hello")
+    atomic_write(path, b"world")
+    assert _read(path) == b"world"
+    assert os.listdir(os.path.dirname(path)) == ["b.txt"]
+    # the directory is recreated if removed by others
+    shutil.rmtree(os.path.dirname(path))
+    atomic_write(path, b"again")
+    assert _read(path) == b"again"
+    # no temp file is left behind on failure
+    try:
+        atomic_write(path, 12345)
+    except TypeError:
+        print("TypeError raised as expected")
+    else:
+        raise AssertionError("TypeError not raised")
+    assert os.listdir(os.path.dirname(path)) == ["b.txt"]
+
+
+def test_fsync_new_dirs(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(writer_module, "_fsync_dir", synced.append)
+    root = str(tmp_path)
+    with BatchWriter(root) as writer:
+        writer.write("x/y/z.txt", "z")
+        writer.write("x/y/w.txt", "w")
+    expected = [os.path.join(root, "x", "y"), os.path.join(root, "x"), root]
+    assert sorted(synced) == sorted(expected)
+
+
+def test_batch_writer(tmp_path):
+    for workers in [0, 4]:
+        root = os.path.join(tmp_path, str(workers))
+        with BatchWriter(root, workers=workers, max_pending=8) as writer:
+            for i in range(100):
+                writer.write("d{}/{}.txt".format(i % 3, i), str(i))
+        assert writer.stats()["files"] == 100
+        assert sorted(os.listdir(root)) == ["d0", "d1", "d2"]
+        assert _read(os.path.join(root, "d2", "98.txt")) == b"98"
@@ -2,18 +2,23 @@
 # coding: utf-8
 
 import volkanic.cmdline
-from volkanic.utils import desktop_open, where, where_site_packages
+from volkanic.utils import desktop_open, where_many, where_site_packages
 
 
 def run_where(_, args):
+    with_versions = "-V" in args or "--versions" in args
+    args = [a for a in args if a not in ("-V", "--versions")]
     if not args:
         return print(where_site_packages() or "")
-    for arg in args:
-        try:
-            path = where(arg)
+    results = where_many(args, versions=with_versions)
+    for arg, result in results.items():
+        path, version = result if with_versions else (result, None)
+        if path is None:
+            path = "ModuleNotFoundError"
+        if with_versions:
+            print(arg, path, version or "", sep="\t")
+        else:
             print(arg, path, sep="\t")
-        except ModuleNotFoundError:
-            print(arg, "ModuleNotFoundError", sep="\t")
 
 
 def run_argv_debug(prog, _):
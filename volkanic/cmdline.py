@@ -4,10 +4,11 @@
 import contextlib
 import os
 import sys
+import time
 from collections import OrderedDict
 from typing import Union
 
-from volkanic.utils import load_symbol
+from volkanic.utils import load_symbol, load_symbol_cached, printerr
 
 
 @contextlib.contextmanager
@@ -109,6 +110,16 @@ class CommandOptionDict(OrderedDict):
         return self
 
 
+def _exit_status(code) -> int:
+    """Map a return value or SystemExit.code to a status as sys.exit() does"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    printerr(code)
+    return 1
+
+
 class CommandRegistry:
     def __init__(self, commands, prog=""):
         self.commands = commands
@@ -143,9 +154,121 @@ class CommandRegistry:
             return self.default_prog or argv[0]
         return os.path.basename(argv[0])
 
+    def _run_line(self, real_prog: str, line: str) -> tuple:
+        """
+        Run one batch line in this process.
+        Returns: (status, seconds)
+        """
+        import shlex
+        import traceback
+
+        start = time.perf_counter()
+        try:
+            args = shlex.split(line)
+            dotpath = self.commands[args[0]]
+        except (ValueError, LookupError):
+            printerr("invalid command line:", line)
+            return 1, time.perf_counter() - start
+        if ":" not in dotpath:
+            dotpath += ":run"
+        prog = "{} {}".format(real_prog, args[0])
+        try:
+            status = _exit_status(load_symbol_cached(dotpath)(prog, args[1:]))
+        except SystemExit as exc:
+            status = _exit_status(exc.code)
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        return status, time.perf_counter() - start
+
+    def run_batch(self, lines, prog=None, workers=0) -> int:
+        """
+        Run each line of `lines` as `<cmd> [args...]` in this process.
+        Blank lines and lines starting with '#' are skipped.
+
+        A line's status is what sys.exit() would make of the command's
+        return value or SystemExit. A tab-separated
+        `lineno, status, seconds, line` record is printed to stderr
+        for every line, in input order, as soon as it has finished.
+        With workers > 0, lines run concurrently in a thread pool.
+
+        Returns: 0 if every line succeeded, otherwise 1
+        """
+        real_prog = prog or self.default_prog or "<prog>"
+
+        # lines are run as they are read, so `lines` can be a pipe
+        def _iter_jobs():
+            for lineno, line in enumerate(lines, 1):
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield lineno, line
+
+        jobs = _iter_jobs()
+
+        def _report(lineno, line, status, seconds):
+            printerr(lineno, status, "{:.6f}".format(seconds), line, sep="\t")
+
+        failed = False
+        if workers <= 0:
+            for lineno, line in jobs:
+                status, seconds = self._run_line(real_prog, line)
+                failed = failed or bool(status)
+                _report(lineno, line, status, seconds)
+            return int(failed)
+
+        import queue
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        # a bounded window of pending lines, reported in order as they finish
+        pending = queue.Queue(maxsize=workers * 2)
+        failures = []
+
+        def _reporter():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                lineno, line, future = item
+                status, seconds = future.result()
+                if status:
+                    failures.append(lineno)
+                _report(lineno, line, status, seconds)
+
+        reporter = threading.Thread(target=_reporter, daemon=True)
+        reporter.start()
+        with ThreadPoolExecutor(workers) as pool:
+            try:
+                for lineno, line in jobs:
+                    future = pool.submit(self._run_line, real_prog, line)
+                    pending.put((lineno, line, future))
+            finally:
+                pending.put(None)
+                reporter.join()
+        return int(bool(failures))
+
+    def _run_batch_argv(self, real_prog: str, args: list):
+        import argparse
+
+        desc = "run one command per line of a file, in one process"
+        pr = argparse.ArgumentParser(
+            prog="{} --batch".format(real_prog), description=desc
+        )
+        pr.add_argument("path", help="a file of command lines, or - for stdin")
+        pr.add_argument(
+            "-j", "--workers", type=int, default=0, help="number of threads"
+        )
+        ns = pr.parse_args(args)
+        if ns.path == "-":
+            return self.run_batch(sys.stdin, real_prog, ns.workers)
+        with open(ns.path) as fin:
+            return self.run_batch(fin, real_prog, ns.workers)
+
     def __call__(self, argv=None):
         argv = sys.argv if argv is None else list(argv)
         real_prog = self.get_real_prog(argv)
+        if argv[1:2] == ["--batch"] and "--batch" not in self.commands:
+            sys.exit(self._run_batch_argv(real_prog, argv[2:]))
         try:
             dotpath = self.commands[argv[1]]
         except LookupError:
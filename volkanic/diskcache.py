@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import contextlib
+import functools
+import hashlib
+import mmap
+import os
+import pickle
+import threading
+
+from volkanic.introspect import format_function_path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_hexdigits = "0123456789abcdef"
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """An exclusive lock across processes; no-op where fcntl is missing"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as fout:
+        fcntl.flock(fout.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fout.fileno(), fcntl.LOCK_UN)
+
+
+def _read_mapped(path: str):
+    with open(path, "rb") as fin:
+        try:
+            return mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return b""
+
+
+class DiskCache:
+    """
+    A persistent key-value cache of bytes, shared by processes.
+
+    Entries are files named by the SHA-256 of their keys,
+    written atomically (write to a temp file, then rename)
+    and read through mmap. The mtime of an entry is its last access time;
+    when the cache grows beyond `max_bytes`, least recently used entries
+    are removed by one process at a time.
+    """
+
+    suffix = ".cache"
+
+    def __init__(self, root: str, max_bytes=2**30, check_every=64):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        # writes between two size checks
+        self.check_every = check_every
+        self._writes = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def hash_key(key) -> str:
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        return hashlib.sha256(key).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:] + self.suffix)
+
+    def get(self, key, default=None):
+        """
+        Returns: a read-only mmap (or b"" for an empty value)
+            which supports slicing and the buffer protocol
+        """
+        path = self._path(self.hash_key(key))
+        try:
+            buf = _read_mapped(path)
+            os.utime(path)
+        except FileNotFoundError:
+            return default
+        return buf
+
+    def set(self, key, value: bytes):
+        path = self._path(self.hash_key(key))
+        dirpath = os.path.dirname(path)
+        tmp_path = "{}.{}-{}.tmp".format(path, os.getpid(), threading.get_ident())
+        try:
+            fout = open(tmp_path, "wb")
+        except FileNotFoundError:
+            os.makedirs(dirpath, exist_ok=True)
+            fout = open(tmp_path, "wb")
+        with fout:
+            fout.write(value)
+        os.replace(tmp_path, path)
+        self._writes += 1
+        if self._writes >= self.check_every:
+            self._writes = 0
+            self.evict()
+
+    def delete(self, key):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path(self.hash_key(key)))
+
+    @staticmethod
+    def _is_shard(entry: os.DirEntry) -> bool:
+        name = entry.name
+        return len(name) == 2 and name.strip(_hexdigits) == "" and entry.is_dir()
+
+    def _iter_entries(self):
+        # only shard dirs, leaving other files under root alone
+        for shard in os.scandir(self.root):
+            if not self._is_shard(shard):
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(self.suffix):
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    st = entry.stat()
+                    yield st.st_mtime, st.st_size, entry.path
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._iter_entries())
+
+    def evict(self, target_ratio=0.9):
+        """Remove least recently used entries if beyond `max_bytes`"""
+        lock_path = os.path.join(self.root, ".lock")
+        with _file_lock(lock_path):
+            entries = sorted(self._iter_entries())
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return 0
+            target = self.max_bytes * target_ratio
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                    removed += 1
+                total -= size
+            return removed
+
+    def clear(self):
+        for _, _, path in list(self._iter_entries()):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def memoize(self, func=None, version=""):
+        """
+        Decorator caching pickled results of `func` on disk,
+        keyed by its path, `version`, and pickled arguments.
+        Bump `version` when the function's logic changes.
+        """
+        if func is None:
+            return functools.partial(self.memoize, version=version)
+        prefix = "{}:{}:".format(format_function_path(func), version).encode()
+
+        @functools.wraps(func)
+        def _func(*args, **kwargs):
+            params = args, sorted(kwargs.items())
+            key = prefix + pickle.dumps(params, protocol=4)
+            buf = self.get(key)
+            if buf is not None:
+                return pickle.loads(buf)
+            result = func(*args, **kwargs)
+            self.set(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            return result
+
+        return _func
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
+import atexit
+import collections
 import logging
 import os
 import re
+import threading
 import weakref
 from pathlib import Path
 from typing import Union
@@ -37,6 +40,123 @@ class WeakSingleton(metaclass=WeakSingletonMeta):
     pass
 
 
+class KeyedInstanceMeta(type):
+    """
+    One instance per (cls, key), where key is the first constructor argument.
+
+    Class attributes read by this metaclass:
+        max_instances: LRU-evict beyond this many instances (None: unbounded)
+        weak_instances: hold instances by weak references
+
+    An evicted instance's `on_evicted()` method, if any, is called
+    outside of any lock, e.g. to close its resources.
+    """
+
+    max_instances = None
+    weak_instances = False
+
+    def __init__(cls, name, bases, attrs):
+        super().__init__(name, bases, attrs)
+        cls._keyed_instances = collections.OrderedDict()
+        cls._keyed_lock = threading.RLock()
+        cls._keyed_creation_locks = {}
+
+    def __call__(cls, key, *args, **kwargs):
+        obj = cls._get_keyed_instance(key)
+        if obj is not None:
+            return obj
+        with cls._keyed_lock:
+            creation_lock = cls._keyed_creation_locks.setdefault(
+                key, threading.Lock()
+            )
+        try:
+            with creation_lock:
+                obj = cls._get_keyed_instance(key)
+                if obj is not None:
+                    return obj
+                obj = super().__call__(key, *args, **kwargs)
+                evicted = cls._set_keyed_instance(key, obj)
+        finally:
+            # also when the constructor raises
+            with cls._keyed_lock:
+                if cls._keyed_creation_locks.get(key) is creation_lock:
+                    del cls._keyed_creation_locks[key]
+        cls._call_evicted(evicted)
+        return obj
+
+    def _get_keyed_instance(cls, key):
+        with cls._keyed_lock:
+            try:
+                ref = cls._keyed_instances[key]
+            except KeyError:
+                return
+            cls._keyed_instances.move_to_end(key)
+        return ref() if cls.weak_instances else ref
+
+    def _set_keyed_instance(cls, key, obj) -> list:
+        if cls.weak_instances:
+            instances = cls._keyed_instances
+
+            def _remove(r):
+                with cls._keyed_lock:
+                    if instances.get(key) is r:
+                        del instances[key]
+
+            ref = weakref.ref(obj, _remove)
+        else:
+            ref = obj
+        evicted = []
+        with cls._keyed_lock:
+            cls._keyed_instances[key] = ref
+            limit = cls.max_instances
+            while limit is not None and len(cls._keyed_instances) > limit:
+                evicted.append(cls._keyed_instances.popitem(last=False)[1])
+        if cls.weak_instances:
+            evicted = [r() for r in evicted]
+        return [o for o in evicted if o is not None]
+
+    @staticmethod
+    def _call_evicted(objects: list):
+        for obj in objects:
+            func = getattr(obj, "on_evicted", None)
+            if func is None:
+                continue
+            try:
+                func()
+            except Exception:
+                _logger.exception("on_evicted() failed for %r", obj)
+
+    def evict_instance(cls, key) -> bool:
+        with cls._keyed_lock:
+            ref = cls._keyed_instances.pop(key, None)
+        obj = ref() if cls.weak_instances and ref is not None else ref
+        cls._call_evicted([obj] if obj is not None else [])
+        return ref is not None
+
+    def clear_instances(cls):
+        with cls._keyed_lock:
+            refs = list(cls._keyed_instances.values())
+            cls._keyed_instances.clear()
+        if cls.weak_instances:
+            refs = [r() for r in refs]
+        cls._call_evicted([o for o in refs if o is not None])
+
+    def count_instances(cls) -> int:
+        return len(cls._keyed_instances)
+
+
+class WeakKeyedInstanceMeta(KeyedInstanceMeta):
+    weak_instances = True
+
+
+class KeyedInstance(metaclass=KeyedInstanceMeta):
+    pass
+
+
+class WeakKeyedInstance(metaclass=WeakKeyedInstanceMeta):
+    pass
+
+
 class _GIMeta(SingletonMeta):
     def __new__(mcs, name, bases, attrs):
         pn = attrs.get("package_name")
@@ -49,9 +169,32 @@ class _GIMeta(SingletonMeta):
         if not re.match(r"\w[\w.]*\w$", pn):
             msg = 'invalid {}.package_name: "{}"'.format(name, pn)
             raise ValueError(msg)
+        namespaces = re.split(r"[._]+", pn)
         attrs["_classcache"] = {}
-        attrs["_namespaces"] = re.split(r"[._]+", pn)
-        return super().__new__(mcs, name, bases, attrs)
+        attrs["_classlock"] = threading.RLock()
+        attrs["_namespaces"] = namespaces
+        # _GIName descriptors, inherited unless overridden,
+        # are replaced by plain strings in each class
+        name_seps = {}
+        for base in reversed(bases):
+            name_seps.update(getattr(base, "_name_seps", {}))
+        for key, val in attrs.items():
+            if isinstance(val, _GIName):
+                name_seps[key] = val.sep
+            else:
+                name_seps.pop(key, None)
+        for key, sep in name_seps.items():
+            attrs[key] = sep.join(namespaces)
+        attrs["_name_seps"] = name_seps
+        cls = super().__new__(mcs, name, bases, attrs)
+        # options merged along the MRO, nearest class first
+        option_table = {}
+        for c in reversed(cls.__mro__):
+            options = c.__dict__.get("_options")
+            if isinstance(options, dict):
+                option_table.update(options)
+        cls._option_table = option_table
+        return cls
 
 
 class _GINamespaces:
@@ -80,9 +223,14 @@ class _GIPath:
 
     def __get__(self, _, owner: _GIMeta) -> Path:
         classcache = getattr(owner, "_classcache")
-        if self.name not in classcache:
-            classcache[self.name] = Path(self.func(owner))
-        return classcache[self.name]
+        try:
+            return classcache[self.name]
+        except KeyError:
+            pass
+        with getattr(owner, "_classlock"):
+            if self.name not in classcache:
+                classcache[self.name] = Path(self.func(owner))
+            return classcache[self.name]
 
 
 class GlobalInterface(metaclass=_GIMeta):
@@ -105,6 +253,9 @@ class GlobalInterface(metaclass=_GIMeta):
         "project_source_depth": 0,
         # for config file locating (_get_conf_paths())
         "confpath_filename": "config.json5",
+        # for json_dumps(): "json", "ujson", "orjson", "auto";
+        # None to follow volkanic.jsonio.set_json_backend()
+        "json_backend": None,
     }
 
     # default config and log format
@@ -118,16 +269,17 @@ class GlobalInterface(metaclass=_GIMeta):
 
     @classmethod
     def _fmt_envvar_name(cls, name):
-        return "{}_{}".format(cls.identifier, name).upper()
+        key = "_fmt_envvar_name", name
+        try:
+            return cls._classcache[key]
+        except KeyError:
+            envvar_name = "{}_{}".format(cls.identifier, name).upper()
+            return cls._classcache.setdefault(key, envvar_name)
 
     @classmethod
     def _get_option(cls, key: str):
-        for c in cls.mro():
-            options = c.__dict__.get("_options")
-            try:
-                return options[key]
-            except (KeyError, TypeError):
-                pass
+        # merged by _GIMeta at class creation
+        return cls._option_table.get(key)
 
     @classmethod
     def _fmt_name(cls, sep="-") -> str:
@@ -144,16 +296,25 @@ class GlobalInterface(metaclass=_GIMeta):
         Override this method in your subclasses for your specific project.
         """
         envvar_name = cls._fmt_envvar_name("confpath")
+        return [os.environ.get(envvar_name)] + cls._get_static_conf_paths()
+
+    @classmethod
+    def _get_static_conf_paths(cls) -> list[str]:
+        """Paths not depending on environment variables, computed once"""
+        try:
+            return cls._classcache["_static_conf_paths"]
+        except KeyError:
+            pass
         names = cls._get_conf_path_names()
         # noinspection PyTypeChecker,PyArgumentList
         relative_path: str = os.path.join(*names)
-        return [
-            os.environ.get(envvar_name),
+        paths = [
             cls.under_project_dir(names[-1]),
             utils.under_home_dir_hidden(relative_path),
             os.path.join("/etc", relative_path),
             os.path.join("/", relative_path),
         ]
+        return cls._classcache.setdefault("_static_conf_paths", paths)
 
     @classmethod
     def _locate_conf(cls):
@@ -181,8 +342,20 @@ class GlobalInterface(metaclass=_GIMeta):
 
     @cached_property
     def conf(self) -> dict:
-        path = self._locate_conf()
         cn = self.__class__.__name__
+        shm_name = os.environ.get(self._fmt_envvar_name("shared_conf"))
+        if shm_name:
+            from volkanic.sharedconf import attach_conf
+
+            # the env var may be inherited from a master no longer running
+            try:
+                conf = attach_conf(shm_name)
+            except (OSError, ValueError) as exc:
+                _logger.warning("cannot attach shared conf %r: %s", shm_name, exc)
+            else:
+                utils.printerr("{}.conf, shared".format(cn), shm_name)
+                return conf
+        path = self._locate_conf()
         if path:
             config = self._parse_conf(path)
             utils.printerr("{}.conf, path".format(cn), path)
@@ -192,6 +365,34 @@ class GlobalInterface(metaclass=_GIMeta):
         config = utils.merge_dicts(self.default_config, config)
         return self._check_conf(config)
 
+    def share_conf(self):
+        """
+        Pack the merged and checked conf into shared memory,
+        for a master process to call before starting its workers.
+
+        Forked workers inherit a lazily-decoding view instead of the dict;
+        spawned workers attach to the segment named by
+        env var `<IDENTIFIER>_SHARED_CONF`.
+        The segment is unlinked when this process exits.
+        """
+        from volkanic.sharedconf import SharedConf, publish_conf
+
+        conf = self.conf
+        if isinstance(conf, SharedConf):
+            return conf
+        segment, conf = publish_conf(conf)
+        os.environ[self._fmt_envvar_name("shared_conf")] = segment.name
+        self.__dict__["conf"] = conf
+        owner_pid = os.getpid()
+
+        def _cleanup():
+            # forked workers run atexit handlers too
+            if os.getpid() == owner_pid:
+                conf.close(unlink=True)
+
+        atexit.register(_cleanup)
+        return conf
+
     @staticmethod
     def under_home_dir(*paths):
         return utils.under_home_dir(*paths)
@@ -243,12 +444,76 @@ class GlobalInterface(metaclass=_GIMeta):
         }
 
     @classmethod
-    def setup_logging(cls, level=None, fmt=None):
+    def json_dumps(cls, obj, **kwargs) -> str:
+        """indented_json_dumps() with the backend of option `json_backend`"""
+        from volkanic.jsonio import get_json_backend
+
+        backend = get_json_backend(cls._get_option("json_backend"))
+        return utils.indented_json_dumps(obj, backend.dumps, **kwargs)
+
+    @classmethod
+    def snapshot_metrics(cls, all_packages=False) -> dict:
+        """
+        Latency metrics recorded by volkanic.metrics.timed/timer;
+        only those named under `package_name` unless `all_packages`.
+        """
+        from volkanic.metrics import registry
+
+        prefix = "" if all_packages else cls.package_name + "."
+        return registry.snapshot(prefix)
+
+    @classmethod
+    def setup_logging(
+        cls,
+        level=None,
+        fmt=None,
+        queued=False,
+        json_lines=False,
+        filename=None,
+        max_bytes=2**26,
+        backup_count=5,
+        queue_size=10000,
+        block=False,
+    ):
+        """
+        Args:
+            level: log level; env var `<IDENTIFIER>_LOGLEVEL` or "DEBUG" if None
+            fmt: log format; `default_logfmt` if None
+            queued: format and write records in a background thread,
+                through a queue of `queue_size`, which drops records
+                when full, or blocks the caller if `block`
+            json_lines: format records as JSON lines, ignoring `fmt`
+            filename: write to a file rotated at `max_bytes`,
+                keeping `backup_count` old files, instead of stderr
+
+        Like logging.basicConfig(), it does nothing if the root logger
+        already has handlers, whichever options are given.
+        """
+        if logging.getLogger().handlers:
+            return
         if not level:
             envvar_name = cls._fmt_envvar_name("loglevel")
             level = os.environ.get(envvar_name, "DEBUG")
         fmt = fmt or cls.default_logfmt
-        logging.basicConfig(level=level, format=fmt)
+        if not (queued or json_lines or filename):
+            return logging.basicConfig(level=level, format=fmt)
+        from logging.handlers import RotatingFileHandler
+
+        from volkanic.logs import JSONLinesFormatter, setup_queued_logging
+
+        if filename:
+            handler = RotatingFileHandler(
+                filename, maxBytes=max_bytes, backupCount=backup_count
+            )
+        else:
+            handler = logging.StreamHandler()
+        if json_lines:
+            handler.setFormatter(JSONLinesFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(fmt))
+        if queued:
+            return setup_queued_logging([handler], level, queue_size, block)
+        logging.basicConfig(level=level, handlers=[handler])
 
 
 class GlobalInterfaceTribal(GlobalInterface):
@@ -275,9 +540,101 @@ class GlobalInterfaceTribal(GlobalInterface):
         f = self._under_resources_dir
         return f("resources_dir", "resources", *paths)
 
+    def open_batch_writer(self, *paths, **kwargs):
+        """A BatchWriter for relative paths under `<data_dir>/<paths>`"""
+        from volkanic.writer import BatchWriter
+
+        root = self.under_data_dir(*paths)
+        return BatchWriter(root, **kwargs)
+
+    @cached_property
+    def scratch(self):
+        """A ScratchSpace under `<data_dir>/tmp/`"""
+        from volkanic.scratch import ScratchSpace
+
+        return ScratchSpace(
+            self.under_data_dir("tmp"),
+            max_age=self.conf.get("scratch_max_age", 86400),
+            quota_bytes=self.conf.get("scratch_quota_bytes"),
+        )
+
+    def map_resource(self, *paths) -> memoryview:
+        """A read-only memoryview of a resource file, mapped once per process"""
+        from volkanic.resources import map_file
+
+        return map_file(self.under_resources_dir(*paths))
+
+    def open_lookup_table(self, *paths):
+        """A LookupTable from a file built by resources.build_lookup_table()"""
+        from volkanic.resources import LookupTable
+
+        return LookupTable(self.under_resources_dir(*paths))
+
+    @cached_property
+    def jinja2_env(self):
+        """
+        A jinja2.Environment configured by `conf['_jinja2_env']`,
+        with these extra keys:
+            templates_dir: under resources dir, default "templates"
+            bytecode_cache: cache compiled templates under
+                `<data_dir>/jinja2_cache/`, default true
+        """
+        from volkanic.templating import build_jinja2_env
+
+        options = dict(self.conf.get("_jinja2_env") or {})
+        templates_dir = options.pop("templates_dir", "templates")
+        cache_dir = None
+        if options.pop("bytecode_cache", True):
+            cache_dir = self.under_data_dir("jinja2_cache/", mkdirs=True)
+        search_path = self.under_resources_dir(templates_dir)
+        return build_jinja2_env(options, [search_path], cache_dir)
+
+    def precompile_templates(self) -> list:
+        """Compile all templates into the bytecode cache, e.g. at deploy"""
+        from volkanic.templating import precompile_templates
+
+        return precompile_templates(self.jinja2_env)
+
     def under_temp_dir(self, ext=""):
-        name = os.urandom(17).hex() + ext
-        return self.under_data_dir("tmp", name, mkdirs=True)
+        return self.scratch.path(ext)
+
+    @cached_property
+    def disk_cache(self):
+        """A DiskCache under `<data_dir>/cache/`"""
+        from volkanic.diskcache import DiskCache
+
+        max_bytes = self.conf.get("disk_cache_max_bytes", 2**30)
+        return DiskCache(self.under_data_dir("cache/", mkdirs=True), max_bytes)
+
+    def setup_file_logging(self, **kwargs):
+        """setup_logging() into `<data_dir>/logs/<project_name>.log`"""
+        filename = self.project_name + ".log"
+        kwargs["filename"] = self.under_data_dir("logs", filename, mkdirs=True)
+        return self.setup_logging(**kwargs)
+
+    def start_sampling_profiler(self, hz: float = None):
+        """
+        Start a SamplingProfiler if `hz` or env var `<IDENTIFIER>_PROFILE_HZ`
+        is set to a positive number of samples per second.
+        Collapsed stacks are written to `<data_dir>/profiles/` at exit.
+        """
+        if hz is None:
+            envvar_name = self._fmt_envvar_name("profile_hz")
+            hz = float(os.environ.get(envvar_name) or 0)
+        if hz <= 0:
+            return
+        from volkanic.profiling import SamplingProfiler, format_profile_filename
+
+        filename = format_profile_filename(self.identifier)
+        path = self.under_data_dir("profiles", filename, mkdirs=True)
+        profiler = SamplingProfiler(interval=1.0 / hz).start()
+
+        def _dump():
+            profiler.stop()
+            profiler.dump(path)
+
+        atexit.register(_dump)
+        return profiler
 
 
 GlobalInterfaceTrial = GlobalInterfaceTribal
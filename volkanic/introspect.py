@@ -10,11 +10,10 @@ import os
 import re
 import string
 import sys
+import time
 import traceback
 import warnings
 
-import setuptools
-
 from volkanic.compat import cached_property
 
 
@@ -53,36 +52,396 @@ def format_function_path(func):
     return "{}.{}".format(klass_path, func.__name__)
 
 
+def format_frame_path(frame) -> str:
+    """Like format_function_path(), for the function running in `frame`"""
+    code = frame.f_code
+    mod = frame.f_globals.get("__name__")
+    qualname = getattr(code, "co_qualname", code.co_name)
+    if mod is None:
+        return qualname
+    return "{}.{}".format(mod, qualname)
+
+
+_identifier_regex = re.compile(r"[_A-Za-z][_A-Za-z0-9]*$")
+
+# directories never worth descending into when looking for modules;
+# hidden directories (.git, .venv, .tox, ...) are skipped as well
+_pruned_dirnames = frozenset(
+    [
+        "__pycache__",
+        "node_modules",
+        "site-packages",
+        "dist-packages",
+    ]
+)
+
+
 def _dot_path(path: str):
     """Convert unix path to python module dot-path"""
     path, ext = os.path.splitext(path)
     parts = path.split(os.sep)
     if len(parts) > 1 and parts[-1] == "__init__":
         parts = parts[:-1]
-    regex = re.compile(r"[_A-Za-z][_A-Za-z0-9]*$")
     for part in parts:
-        if not regex.match(part):
+        if not _identifier_regex.match(part):
             return
     return ".".join(parts)
 
 
-def find_all_py_files(search_dir: str, relative=False):
-    for path in setuptools.findall(search_dir):
-        if not path.endswith(".py"):
-            continue
-        if relative:
-            path = os.path.relpath(path, search_dir)
+def _is_pruned_dirname(name: str) -> bool:
+    return name.startswith(".") or name in _pruned_dirnames
+
+
+def _scan_dir(dirpath: str):
+    """
+    List a directory with a single os.scandir() call.
+    Returns: (py_filenames, subdir_names, symlinked_subdir_names), all sorted;
+    virtualenvs (with a `pyvenv.cfg` file) look like empty directories.
+    """
+    filenames = []
+    subdirs = []
+    linked = []
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                name = entry.name
+                if name == "pyvenv.cfg":
+                    return [], [], []
+                try:
+                    if entry.is_dir():
+                        subdirs.append(name)
+                        if entry.is_symlink():
+                            linked.append(name)
+                    elif name.endswith(".py"):
+                        filenames.append(name)
+                except OSError:
+                    continue
+    except OSError:
+        return [], [], []
+    filenames.sort()
+    subdirs.sort()
+    linked.sort()
+    return filenames, subdirs, linked
+
+
+class DirectoryIndex:
+    """
+    A persistent, mtime-keyed cache of directory listings.
+
+    A directory's mtime changes whenever an entry is added, removed
+    or renamed in it, so an unchanged mtime means the cached listing
+    is still valid and the directory needs not be scanned again.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.entries = {}
+        self._dirty = False
+        if path:
+            self.load()
+
+    def load(self):
+        import json
+
+        try:
+            with open(self.path) as fin:
+                entries = json.load(fin)
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, dict):
+            self.entries = entries
+
+    def save(self):
+        import json
+
+        if not self.path or not self._dirty:
+            return
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tmp_path, "w") as fout:
+            json.dump(self.entries, fout)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def scan(self, dirpath: str):
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return [], [], []
+        cached = self.entries.get(dirpath)
+        # entries of 3 items are from an older version, without symlinks
+        if cached and len(cached) == 4 and cached[0] == mtime:
+            return cached[1], cached[2], cached[3]
+        filenames, subdirs, linked = _scan_dir(dirpath)
+        self.entries[dirpath] = [mtime, filenames, subdirs, linked]
+        self._dirty = True
+        return filenames, subdirs, linked
+
+
+def _is_new_link_target(path: str, seen: set) -> bool:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    key = st.st_dev, st.st_ino
+    if key in seen:
+        return False
+    seen.add(key)
+    return True
+
+
+def _walk_py_files(
+    search_dir: str,
+    prune=_is_pruned_dirname,
+    packages_only=False,
+    workers=0,
+    index: DirectoryIndex = None,
+):
+    """
+    Breadth-first walk yielding paths of .py files relative to `search_dir`.
+    Directories of the same level are scanned in a thread pool if `workers`.
+    Symlinked directories are followed, each target only once.
+    """
+    scan = index.scan if index else _scan_dir
+    try:
+        st = os.stat(search_dir)
+        seen_links = {(st.st_dev, st.st_ino)}
+    except OSError:
+        seen_links = set()
+    executor = None
+    if workers:
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+    frontier = [""]
+    try:
+        while frontier:
+            dirpaths = [os.path.join(search_dir, d) for d in frontier]
+            if executor and len(dirpaths) > 1:
+                listings = executor.map(scan, dirpaths)
+            else:
+                listings = map(scan, dirpaths)
+            next_frontier = []
+            for reldir, (filenames, subdirs, linked) in zip(frontier, listings):
+                # below the top level, only descend into regular packages
+                if packages_only and reldir and "__init__.py" not in filenames:
+                    continue
+                for name in filenames:
+                    yield os.path.join(reldir, name)
+                for name in subdirs:
+                    if prune(name):
+                        continue
+                    subdir = os.path.join(reldir, name)
+                    # guard against symlink cycles
+                    if name in linked and not _is_new_link_target(
+                        os.path.join(search_dir, subdir), seen_links
+                    ):
+                        continue
+                    next_frontier.append(subdir)
+            frontier = next_frontier
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
+        if index:
+            index.save()
+
+
+def find_all_py_files(
+    search_dir: str,
+    relative=False,
+    workers=0,
+    index_path: str = None,
+    packages_only=False,
+):
+    """
+    Find all .py files under `search_dir`,
+    skipping hidden directories, virtualenvs, `__pycache__` and `node_modules`.
+
+    Args:
+        search_dir: top-level directory
+        relative: yield paths relative to `search_dir`
+        workers: number of threads to scan directories with, 0 for serial
+        index_path: a file to persist directory listings in;
+            repeated scans only re-list directories whose mtime changed
+        packages_only: do not descend into sub-directories
+            without an `__init__.py`
+    """
+    index = DirectoryIndex(index_path) if index_path else None
+    paths = _walk_py_files(
+        search_dir,
+        packages_only=packages_only,
+        workers=workers,
+        index=index,
+    )
+    for path in paths:
+        if not relative:
+            path = os.path.join(search_dir, path)
         yield path
 
 
-def find_all_plain_modules(search_dir: str):
-    for path in find_all_py_files(search_dir, relative=True):
+def _is_pruned_module_dirname(name: str) -> bool:
+    return _is_pruned_dirname(name) or not _identifier_regex.match(name)
+
+
+def find_all_plain_modules(
+    search_dir: str,
+    workers=0,
+    index_path: str = None,
+    packages_only=False,
+):
+    index = DirectoryIndex(index_path) if index_path else None
+    paths = _walk_py_files(
+        search_dir,
+        prune=_is_pruned_module_dirname,
+        packages_only=packages_only,
+        workers=workers,
+        index=index,
+    )
+    for path in paths:
         dotpath = _dot_path(path)
         if not dotpath:
             continue
         yield dotpath
 
 
+def _locate_module_source(dotpath: str, search_dirs) -> str:
+    """Find the source file of a module without importing anything"""
+    relpath = os.path.join(*dotpath.split("."))
+    for search_dir in search_dirs:
+        if not isinstance(search_dir, str):
+            continue
+        base = os.path.join(search_dir or os.curdir, relpath)
+        for path in [base + ".py", os.path.join(base, "__init__.py")]:
+            if os.path.isfile(path):
+                return path
+
+
+def _is_bytecode_fresh(path: str) -> bool:
+    """Check the header of the cached .pyc against the source file"""
+    import importlib.util
+
+    try:
+        with open(importlib.util.cache_from_source(path), "rb") as fin:
+            header = fin.read(16)
+        st = os.stat(path)
+    except (OSError, NotImplementedError, ValueError):
+        return False
+    if len(header) < 16 or header[:4] != importlib.util.MAGIC_NUMBER:
+        return False
+    # a non-zero flags field means hash-based pyc
+    if int.from_bytes(header[4:8], "little"):
+        return False
+    mtime = int.from_bytes(header[8:12], "little")
+    size = int.from_bytes(header[12:16], "little")
+    return mtime == int(st.st_mtime) & 0xFFFFFFFF and size == st.st_size & 0xFFFFFFFF
+
+
+def _precompile(path: str) -> bool:
+    import py_compile
+
+    if _is_bytecode_fresh(path):
+        return False
+    py_compile.compile(path, doraise=True)
+    return True
+
+
+def warm_pycache(dotpaths, search_dirs=None, workers=4) -> dict:
+    """
+    Byte-compile source files of modules in a thread pool, without importing.
+    Up-to-date .pyc files are left alone.
+    Returns: (dict) {dotpath: True (compiled) / False (fresh) / exception}
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if search_dirs is None:
+        search_dirs = sys.path
+    located = {}
+    for dotpath in dotpaths:
+        path = _locate_module_source(dotpath.split(":")[0], search_dirs)
+        if path:
+            located[dotpath] = path
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        # "pkg.mod" and "pkg.mod:attr" share a source file
+        futures = {p: executor.submit(_precompile, p) for p in set(located.values())}
+        for dotpath, path in located.items():
+            try:
+                results[dotpath] = futures[path].result()
+            except Exception as exc:
+                results[dotpath] = exc
+    return results
+
+
+# dotpath => ErrorInfo, of imports which failed in this process
+_import_failures = {}
+
+
+class ImportReport:
+    def __init__(self):
+        # dotpath => seconds, including time spent on not-yet-imported deps
+        self.durations = {}
+        # dotpath => ErrorInfo
+        self.failures = {}
+        # dotpath => ErrorInfo, skipped because failed earlier
+        self.skipped = {}
+        # "module:attr" => loaded symbol
+        self.symbols = {}
+
+    @property
+    def total_duration(self) -> float:
+        return sum(self.durations.values())
+
+    def slowest(self, n=10) -> list:
+        pairs = sorted(self.durations.items(), key=lambda p: p[1], reverse=True)
+        return pairs[:n]
+
+    def to_dict(self) -> dict:
+        return {
+            "total_duration": self.total_duration,
+            "durations": self.durations,
+            "failures": {k: v.exc_string for k, v in self.failures.items()},
+            "skipped": sorted(self.skipped),
+        }
+
+
+def import_all_modules(
+    dotpaths,
+    search_dirs=None,
+    workers=4,
+    precompile=True,
+    retry=False,
+) -> ImportReport:
+    """
+    Import many modules, e.g. those from find_all_plain_modules().
+
+    Source files are byte-compiled (and thereby pre-read) in threads first,
+    then modules are imported one by one with parents before children.
+    Failures are kept per process and not retried unless `retry`.
+    Items like "module:attr" are resolved with load_symbol() as well.
+    """
+    from volkanic.utils import load_symbol
+
+    dotpaths = sorted(set(dotpaths))
+    if precompile:
+        warm_pycache(dotpaths, search_dirs, workers)
+    report = ImportReport()
+    for dotpath in dotpaths:
+        if not retry and dotpath in _import_failures:
+            report.skipped[dotpath] = _import_failures[dotpath]
+            continue
+        t = time.perf_counter()
+        try:
+            symbol = load_symbol(dotpath)
+        except Exception as exc:
+            _import_failures[dotpath] = report.failures[dotpath] = ErrorInfo(exc)
+            continue
+        finally:
+            report.durations[dotpath] = time.perf_counter() - t
+        _import_failures.pop(dotpath, None)
+        if ":" in dotpath:
+            report.symbols[dotpath] = symbol
+    return report
+
+
 def _trim_str(obj: str, limit: int):
     obj = str(obj)
     if len(obj) > limit:
@@ -164,6 +523,229 @@ def query_object(obj, dotpath: str):
     return obj
 
 
+# outcomes of _QuerySegment.step()
+_QUERY_CONTINUE = 0
+_QUERY_MISSING = 1
+_QUERY_STOP = 2
+
+
+class _QuerySegment:
+    __slots__ = ["part", "index", "dict_key", "list_index"]
+
+    def __init__(self, part: str):
+        self.part = part
+        try:
+            self.index = int(part)
+        except ValueError:
+            self.index = None
+        # for exact dict and list instances, getattr() is known to fail
+        # unless `part` names a method, so it can be skipped
+        self.dict_key = not hasattr(dict, part)
+        self.list_index = not hasattr(list, part)
+
+    def step(self, obj):
+        """Same as one iteration in query_object(); returns (obj, outcome)"""
+        tp = type(obj)
+        if tp is dict and self.dict_key:
+            try:
+                return obj[self.part], _QUERY_CONTINUE
+            except KeyError:
+                return None, _QUERY_MISSING
+        if tp is list and self.list_index:
+            if self.index is None:
+                return None, _QUERY_MISSING
+            try:
+                return obj[self.index], _QUERY_CONTINUE
+            except IndexError:
+                return None, _QUERY_MISSING
+        try:
+            return getattr(obj, self.part), _QUERY_CONTINUE
+        except AttributeError:
+            pass
+        if isinstance(obj, dict):
+            try:
+                return obj[self.part], _QUERY_CONTINUE
+            except KeyError:
+                return None, _QUERY_MISSING
+        if isinstance(obj, list):
+            if self.index is None:
+                return None, _QUERY_MISSING
+            try:
+                return obj[self.index], _QUERY_CONTINUE
+            except IndexError:
+                return None, _QUERY_MISSING
+        return obj, _QUERY_STOP
+
+
+class CompiledQuery:
+    """
+    A reusable form of query_object(obj, dotpath).
+
+    >>> q = compile_query("a.0.b")
+    >>> q({"a": [{"b": 1}]})
+    1
+    """
+
+    def __init__(self, dotpath: str):
+        self.dotpath = dotpath
+        self.segments = [_QuerySegment(p) for p in dotpath.split(".")]
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.dotpath)
+
+    def __call__(self, obj):
+        for seg in self.segments:
+            obj, outcome = seg.step(obj)
+            if outcome:
+                break
+        return obj
+
+    def map(self, objects) -> list:
+        """Apply the query to each of `objects`"""
+        return [self(obj) for obj in objects]
+
+
+def compile_query(dotpath: str) -> CompiledQuery:
+    return CompiledQuery(dotpath)
+
+
+class _QueryTrieNode:
+    __slots__ = ["slots", "children", "subtree_slots"]
+
+    def __init__(self):
+        # positions of dotpaths ending at this node
+        self.slots = []
+        # part => (_QuerySegment, _QueryTrieNode)
+        self.children = {}
+        self.subtree_slots = []
+
+
+class MultiQuery:
+    """
+    Query several dotpaths on the same object at once;
+    common prefixes like "a.b" in ["a.b.c", "a.b.d"] are looked up only once.
+
+    >>> q = MultiQuery(["a.b", "a.c"])
+    >>> q({"a": {"b": 1, "c": 2}})
+    [1, 2]
+    """
+
+    def __init__(self, dotpaths):
+        self.dotpaths = list(dotpaths)
+        root = _QueryTrieNode()
+        for slot, dotpath in enumerate(self.dotpaths):
+            node = root
+            for part in dotpath.split("."):
+                try:
+                    node = node.children[part][1]
+                except KeyError:
+                    child = _QueryTrieNode()
+                    node.children[part] = _QuerySegment(part), child
+                    node = child
+                node.subtree_slots.append(slot)
+            node.slots.append(slot)
+        # the trie flattened in pre-order; each instruction reads register
+        # `src` and writes `dst`, or jumps past its subtree on a dead end
+        self._program = []
+        self._register_count = 1
+        self._emit(root, 0)
+
+    def _emit(self, node: _QueryTrieNode, src: int):
+        for seg, child in node.children.values():
+            dst = self._register_count
+            self._register_count += 1
+            pos = len(self._program)
+            self._program.append(None)
+            self._emit(child, dst)
+            self._program[pos] = (
+                src,
+                seg.step,
+                dst,
+                len(self._program),
+                child.subtree_slots,
+                child.slots,
+            )
+
+    def __call__(self, obj) -> list:
+        values = [None] * len(self.dotpaths)
+        registers = [obj] * self._register_count
+        program = self._program
+        n = len(program)
+        i = 0
+        while i < n:
+            src, step, dst, end, subtree_slots, slots = program[i]
+            val, outcome = step(registers[src])
+            if outcome:
+                for slot in subtree_slots:
+                    values[slot] = val
+                i = end
+                continue
+            registers[dst] = val
+            for slot in slots:
+                values[slot] = val
+            i += 1
+        return values
+
+    def map(self, objects) -> list:
+        return [self(obj) for obj in objects]
+
+
+def _column_fill_value(typecode, fill):
+    if fill is not None or not typecode:
+        return fill
+    if typecode in "fd":
+        return float("nan")
+
+
+def extract_columns(
+    objects, dotpaths, typecodes: dict = None, fills: dict = None, numpy=False
+) -> dict:
+    """
+    Extract several dotpaths from many objects in a single pass.
+
+    Args:
+        objects: an iterable of dicts, lists or any objects
+        dotpaths: same as in query_object()
+        typecodes: {dotpath: typecode}, such columns are array.array's
+        fills: {dotpath: value} to put in typed columns for missing values;
+            NaN for float typecodes by default, integer columns
+            with missing values and no fill value raise ValueError
+        numpy: return typed columns as numpy arrays (sharing memory)
+
+    Returns: {dotpath: column}, untyped columns are lists
+        holding None for missing values, like query_object()
+    """
+    import array
+
+    dotpaths = list(dotpaths)
+    typecodes = typecodes or {}
+    fills = fills or {}
+    query = MultiQuery(dotpaths)
+    columns = []
+    fill_values = []
+    for dotpath in dotpaths:
+        typecode = typecodes.get(dotpath)
+        columns.append(array.array(typecode) if typecode else [])
+        fill_values.append(_column_fill_value(typecode, fills.get(dotpath)))
+    appenders = [c.append for c in columns]
+    for row, obj in enumerate(objects):
+        for ix, val in enumerate(query(obj)):
+            if val is None:
+                val = fill_values[ix]
+                if val is None and typecodes.get(dotpaths[ix]):
+                    msg = "missing value of {!r} in row {}".format(dotpaths[ix], row)
+                    raise ValueError(msg)
+            appenders[ix](val)
+    if numpy:
+        import numpy as np
+
+        columns = [
+            np.frombuffer(c, dtype=c.typecode) if isinstance(c, array.array) else c
+            for c in columns
+        ]
+    return dict(zip(dotpaths, columns))
+
+
 def get_caller_locals(depth: int):
     """
     Get the local variables in one of the outer frame.
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import contextlib
+import importlib
+import importlib.util
+import itertools
+import json
+
+from volkanic.utils import indented_json_dumps, json_default
+
+
+class JSONBackend:
+    """
+    Adapter of a JSON library to the json.dumps() interface;
+    dumps() returns str, dumpb() returns UTF-8 encoded bytes.
+    """
+
+    name = "json"
+
+    def __init__(self):
+        self.module = importlib.import_module(self.name)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.module.dumps(obj, **kwargs)
+
+    def dumpb(self, obj, **kwargs) -> bytes:
+        return self.dumps(obj, **kwargs).encode("utf-8")
+
+    def loads(self, s):
+        return self.module.loads(s)
+
+
+class UJSONBackend(JSONBackend):
+    name = "ujson"
+
+    def dumps(self, obj, **kwargs) -> str:
+        kwargs.setdefault("escape_forward_slashes", False)
+        if kwargs.get("indent") is None:
+            kwargs["indent"] = 0
+        return self.module.dumps(obj, **kwargs)
+
+
+class ORJSONBackend(JSONBackend):
+    """
+    Note that orjson only indents by 2 spaces, always emits UTF-8
+    (ensure_ascii is ignored), and has no `separators`.
+    Datetimes and dataclasses are passed to `default`, as with stdlib json.
+    """
+
+    name = "orjson"
+
+    def _option(self, indent=None, sort_keys=False, **_) -> int:
+        m = self.module
+        option = m.OPT_NON_STR_KEYS
+        option |= m.OPT_PASSTHROUGH_DATETIME | m.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= m.OPT_INDENT_2
+        if sort_keys:
+            option |= m.OPT_SORT_KEYS
+        return option
+
+    def dumpb(self, obj, default=None, **kwargs) -> bytes:
+        return self.module.dumps(obj, default=default, option=self._option(**kwargs))
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumpb(obj, **kwargs).decode("utf-8")
+
+
+_backend_classes = {
+    "json": JSONBackend,
+    "ujson": UJSONBackend,
+    "orjson": ORJSONBackend,
+}
+_backends = {}
+_default_backend_name = "json"
+
+
+def get_json_backend(name: str = None) -> JSONBackend:
+    """
+    Args:
+        name: "json", "ujson", "orjson", or "auto" for the fastest installed;
+            the one set by set_json_backend() if None
+    """
+    name = name or _default_backend_name
+    if name == "auto":
+        for name in ["orjson", "ujson", "json"]:
+            if importlib.util.find_spec(name) is not None:
+                break
+    try:
+        return _backends[name]
+    except KeyError:
+        pass
+    try:
+        cls = _backend_classes[name]
+    except KeyError:
+        raise ValueError("unknown JSON backend: {!r}".format(name))
+    return _backends.setdefault(name, cls())
+
+
+def set_json_backend(name: str):
+    """Select the backend used by indented_json_dumps() process-wide"""
+    global _default_backend_name
+    _default_backend_name = get_json_backend(name).name
+
+
+@contextlib.contextmanager
+def _opened(file, mode="r"):
+    if hasattr(file, "read") or hasattr(file, "write"):
+        yield file
+        return
+    with open(file, mode, encoding="utf-8") as fileobj:
+        yield fileobj
+
+
+def _batched(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_json_lines(file):
+    with _opened(file) as fin:
+        for line in fin:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_json_lines(file, batch_size: int = None):
+    """
+    Yield records of a JSON Lines file (a path or a text file object)
+    one by one, or in lists of `batch_size` records.
+    """
+    records = _iter_json_lines(file)
+    if batch_size:
+        return _batched(records, batch_size)
+    return records
+
+
+class _ArrayReader:
+    """Incremental parser of a top-level JSON array"""
+
+    whitespace = " \t\r\n"
+
+    def __init__(self, fin, chunk_size: int):
+        self.fin = fin
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read_more(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fin.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop consumed text, so memory is bounded by the largest record
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        """Skip whitespace and return the next char, '' at EOF"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in self.whitespace:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._read_more(self.chunk_size):
+                return ""
+
+    def _error(self, msg: str):
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def _decode(self):
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                # malformed data is reported at once, without reading on
+                if not self._is_truncated(exc) or not self._read_more(size):
+                    raise
+                size *= 2
+                continue
+            # a number cut at the end of the buffer may continue in the next
+            # chunk, e.g. `1` is decoded from `1.` in a buffer ending there
+            if self._may_continue(obj, end) and self._read_more(size):
+                continue
+            self.pos = end
+            return obj
+
+    def _is_truncated(self, exc: json.JSONDecodeError) -> bool:
+        """Whether the error may be due to a value cut at the buffer end"""
+        if exc.msg.startswith("Unterminated string"):
+            return True
+        # e.g. a literal (`fals`) or an escape (`\u12`) cut short
+        # is reported at its start
+        return len(self.buf) - exc.pos <= 8
+
+    def _may_continue(self, obj, end: int) -> bool:
+        if not isinstance(obj, (int, float)) or isinstance(obj, bool):
+            return False
+        while end < len(self.buf) and self.buf[end] in self.whitespace:
+            end += 1
+        return end == len(self.buf) or self.buf[end] not in ",]"
+
+    def __iter__(self):
+        if self._next_char() != "[":
+            raise self._error("expecting '[' at the beginning")
+        self.pos += 1
+        if self._next_char() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            char = self._next_char()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self.pos -= 1
+                raise self._error("expecting ',' or ']'")
+            if self._next_char() in ("]", ""):
+                raise self._error("expecting value")
+
+
+def iter_json_array(file, batch_size: int = None, chunk_size=2**16):
+    """
+    Yield elements of a top-level JSON array lazily
+    from a path or a text file object, reading `chunk_size` chars at a time.
+    """
+
+    def _iter():
+        with _opened(file) as fin:
+            yield from _ArrayReader(fin, chunk_size)
+
+    if batch_size:
+        return _batched(_iter(), batch_size)
+    return _iter()
+
+
+def write_json_lines(records, file, **kwargs) -> int:
+    """Write records as JSON Lines; returns the number of records"""
+    kwargs.setdefault("default", json_default)
+    kwargs.setdefault("ensure_ascii", False)
+    count = 0
+    with _opened(file, "w") as fout:
+        for record in records:
+            fout.write(json.dumps(record, **kwargs))
+            fout.write("\n")
+            count += 1
+    return count
+
+
+def write_json_array(records, file, dumps=None, **kwargs) -> int:
+    """
+    Stream records into a JSON array, formatted the same way as
+    indented_json_dumps(list(records)); returns the number of records
+    """
+    dumps = dumps or indented_json_dumps
+    indent = kwargs.setdefault("indent", 4)
+    prefix = " " * indent if isinstance(indent, int) else indent or ""
+    count = 0
+    with _opened(file, "w") as fout:
+        for record in records:
+            fout.write(",\n" if count else "[\n")
+            text = dumps(record, **kwargs)
+            if prefix:
+                text = prefix + text.replace("\n", "\n" + prefix)
+            fout.write(text)
+            count += 1
+        fout.write("\n]\n" if count else "[]\n")
+    return count
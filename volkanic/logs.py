@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler with a bounded queue, which either drops records
+    when the queue is full (counting them in `dropped`),
+    or blocks the caller for up to `timeout` seconds (backpressure).
+
+    Unlike QueueHandler, records are put as is and formatted by the
+    listener thread; note that arguments of a log call are formatted
+    later and should not be mutated after the call.
+    """
+
+    def __init__(self, maxsize=10000, block=False, timeout=None):
+        super().__init__(queue.Queue(maxsize))
+        self.block = block
+        self.timeout = timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put(record, self.block, self.timeout)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Format each record as one line of JSON"""
+
+    fields = ["name", "levelname", "process", "thread", "funcName", "lineno"]
+
+    def format(self, record) -> str:
+        data = {"ts": record.created}
+        for field in self.fields:
+            data[field] = getattr(record, field, None)
+        data["message"] = record.getMessage()
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _stop_listener(listener: logging.handlers.QueueListener):
+    # QueueListener.stop() fails if called twice
+    if getattr(listener, "_thread", None) is not None:
+        listener.stop()
+
+
+def setup_queued_logging(
+    handlers: list, level="DEBUG", maxsize=10000, block=False, timeout=None
+) -> logging.handlers.QueueListener:
+    """
+    Route records of the root logger through a bounded queue to `handlers`,
+    which run in a background thread. Stopped (and flushed) at exit.
+    Each call adds another queue and thread; existing handlers are kept.
+    """
+    handler = BoundedQueueHandler(maxsize, block, timeout)
+    listener = logging.handlers.QueueListener(
+        handler.queue, *handlers, respect_handler_level=True
+    )
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import contextlib
+import functools
+import threading
+import time
+import weakref
+
+from volkanic.introspect import format_function_path
+
+# latencies in nanoseconds are counted in log-linear buckets:
+# values below 16 have a bucket each, above that every power of 2
+# is divided into 8 buckets, i.e. a relative error of at most 12.5%
+_SUB_BUCKET_BITS = 3
+_BUCKET_COUNT = (64 - _SUB_BUCKET_BITS) << _SUB_BUCKET_BITS
+
+
+def _bucket_index(ns: int) -> int:
+    e = ns.bit_length()
+    if e <= 4:
+        return ns
+    return ((e - 3) << 3) | ((ns >> (e - 4)) & 7)
+
+
+def _bucket_bounds(index: int) -> tuple:
+    """Returns: (lowest, highest) values counted in bucket `index`"""
+    if index < 16:
+        return index, index
+    e = (index >> 3) + 3
+    low = (8 | (index & 7)) << (e - 4)
+    return low, low + (1 << (e - 4)) - 1
+
+
+class _ShardOwner:
+    """Dies with its thread's locals, retiring the thread's shard"""
+
+    __slots__ = ["__weakref__"]
+
+
+def _new_counts() -> list:
+    # [count, total_ns, max_ns, buckets]
+    return [0, 0, 0, [0] * _BUCKET_COUNT]
+
+
+class LatencyMetric:
+    """
+    Call count and latency histogram of one code path.
+
+    Each thread records into its own shard without locking;
+    shards are merged when the metric is read.
+    Shards of finished threads are folded into one retired shard.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._local = threading.local()
+        # id(shard) => shard
+        self._shards = {}
+        self._retired = _new_counts()
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> list:
+        shard = _new_counts()
+        owner = _ShardOwner()
+        weakref.finalize(owner, self._retire, shard)
+        with self._lock:
+            self._shards[id(shard)] = shard
+        self._local.owner = owner
+        self._local.shard = shard
+        return shard
+
+    def _retire(self, shard: list):
+        with self._lock:
+            if self._shards.pop(id(shard), None) is not None:
+                self._fold(self._retired, shard)
+
+    @staticmethod
+    def _fold(target: list, shard: list):
+        target[0] += shard[0]
+        target[1] += shard[1]
+        target[2] = max(target[2], shard[2])
+        buckets = target[3]
+        for ix, n in enumerate(shard[3]):
+            if n:
+                buckets[ix] += n
+
+    def record(self, ns: int):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += 1
+        shard[1] += ns
+        if ns > shard[2]:
+            shard[2] = ns
+        e = ns.bit_length()
+        if e <= 4:
+            shard[3][ns] += 1
+        else:
+            shard[3][((e - 3) << 3) | ((ns >> (e - 4)) & 7)] += 1
+
+    def reset(self):
+        # shards are zeroed in place, since timed() functions hold them
+        with self._lock:
+            for shard in list(self._shards.values()) + [self._retired]:
+                shard[:3] = [0, 0, 0]
+                shard[3] = [0] * _BUCKET_COUNT
+
+    def merged(self) -> tuple:
+        total = _new_counts()
+        with self._lock:
+            shards = list(self._shards.values()) + [self._retired]
+        for shard in shards:
+            self._fold(total, shard)
+        return tuple(total)
+
+    def snapshot(self, percentiles=(50, 90, 99, 99.9)) -> dict:
+        count, total, max_ns, buckets = self.merged()
+        info = {
+            "count": count,
+            "total_ns": total,
+            "mean_ns": total / count if count else 0,
+            "max_ns": max_ns,
+        }
+        thresholds = [(p, count * p / 100.0) for p in percentiles]
+        seen = 0
+        for ix, n in enumerate(buckets):
+            if not n:
+                continue
+            seen += n
+            while thresholds and seen >= thresholds[0][1]:
+                p, _ = thresholds.pop(0)
+                info["p{:g}_ns".format(p)] = min(_bucket_bounds(ix)[1], max_ns)
+        for p, _ in thresholds:
+            info["p{:g}_ns".format(p)] = 0
+        return info
+
+
+class MetricRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> LatencyMetric:
+        try:
+            return self.metrics[name]
+        except KeyError:
+            pass
+        with self._lock:
+            return self.metrics.setdefault(name, LatencyMetric(name))
+
+    def timed(self, func=None, name: str = None):
+        """
+        Decorator recording latency of each call,
+        keyed by format_function_path(func) unless `name` is given.
+        """
+        if func is None:
+            return functools.partial(self.timed, name=name)
+        metric = self.get(name or format_function_path(func))
+        local = metric._local
+        new_shard = metric._new_shard
+        perf_counter_ns = time.perf_counter_ns
+
+        # LatencyMetric.record() inlined, saving a call per call;
+        # the inner try costs nothing unless it raises (Python 3.11+)
+        @functools.wraps(func)
+        def _func(*args, **kwargs):
+            t = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ns = perf_counter_ns() - t
+                try:
+                    shard = local.shard
+                except AttributeError:
+                    shard = new_shard()
+                shard[0] += 1
+                shard[1] += ns
+                if ns > shard[2]:
+                    shard[2] = ns
+                e = ns.bit_length()
+                if e <= 4:
+                    shard[3][ns] += 1
+                else:
+                    shard[3][((e - 3) << 3) | ((ns >> (e - 4)) & 7)] += 1
+
+        return _func
+
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        record = self.get(name).record
+        t = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            record(time.perf_counter_ns() - t)
+
+    def snapshot(self, prefix: str = "") -> dict:
+        return {
+            name: metric.snapshot()
+            for name, metric in sorted(self.metrics.items())
+            if name.startswith(prefix)
+        }
+
+    def reset(self):
+        for metric in list(self.metrics.values()):
+            metric.reset()
+
+
+registry = MetricRegistry()
+timed = registry.timed
+timer = registry.timer
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import collections
+import os
+import sys
+import threading
+import time
+
+from volkanic import utils
+from volkanic.introspect import format_frame_path
+
+
+class SamplingProfiler:
+    """
+    An in-process sampling profiler.
+
+    A daemon thread takes a snapshot of all other threads' stacks
+    with sys._current_frames() every `interval` seconds,
+    and counts them as collapsed stacks, i.e. lines like
+    "mod.main;mod.work;mod.step 42", the input format of flamegraph.pl
+    and speedscope.
+    """
+
+    def __init__(self, interval=0.01, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.counts = collections.Counter()
+        self.sample_count = 0
+        # code object => formatted path, as formatting is the hot part
+        self._labels = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        try:
+            return self._labels[code]
+        except KeyError:
+            return self._labels.setdefault(code, format_frame_path(frame))
+
+    def sample(self):
+        own_ident = threading.get_ident()
+        # noinspection PyProtectedMember
+        frames = sys._current_frames()
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(self._label(frame))
+                frame = frame.f_back
+            labels.reverse()
+            self.counts[";".join(labels)] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if self.running:
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="volkanic-sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def format_collapsed(self) -> str:
+        lines = ["{} {}".format(k, v) for k, v in sorted(self.counts.copy().items())]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def dump(self, path: str):
+        """Write collapsed stacks to `path` atomically"""
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with utils.open_and_mkdirs(tmp_path) as fout:
+            fout.write(self.format_collapsed())
+        os.replace(tmp_path, path)
+        return path
+
+
+def format_profile_filename(prefix: str) -> str:
+    ts = time.strftime("%Y%m%d-%H%M%S")
+    return "{}-{}-{}.collapsed".format(prefix, ts, os.getpid())
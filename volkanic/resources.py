@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import mmap
+import os
+import struct
+import threading
+
+# absolute path => read-only memoryview over an mmap
+_mappings = {}
+_mappings_lock = threading.Lock()
+
+
+def _map_readonly(path: str) -> memoryview:
+    with open(path, "rb") as fin:
+        try:
+            mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return memoryview(b"")
+    return memoryview(mm)
+
+
+def map_file(path: str) -> memoryview:
+    """
+    Map a file read-only into memory, once per process.
+
+    Pages come from the OS page cache, so workers mapping the same file
+    -- or inheriting the mapping through fork() -- share physical memory
+    instead of holding private copies.
+    The file must not be modified in place while mapped;
+    replace it with a rename and call unmap_file() instead.
+    """
+    path = os.path.abspath(path)
+    try:
+        return _mappings[path]
+    except KeyError:
+        pass
+    with _mappings_lock:
+        try:
+            return _mappings[path]
+        except KeyError:
+            return _mappings.setdefault(path, _map_readonly(path))
+
+
+def unmap_file(path: str):
+    """
+    Forget the mapping of `path`; the next map_file() maps it again.
+    The memory is released once no buffer refers to it.
+    """
+    with _mappings_lock:
+        _mappings.pop(os.path.abspath(path), None)
+
+
+def mapped_files() -> list:
+    return sorted(_mappings)
+
+
+# lookup table file layout, all integers little-endian:
+#   header: magic, version, count, offsets of key index, keys and values
+#   key index: `count` entries of (key offset, key length,
+#       value offset, value length), sorted by key bytes
+#   keys blob, values blob
+_LT_MAGIC = b"VLKT"
+_LT_VERSION = 1
+_LT_HEADER = struct.Struct("<4sIQQQQ")
+_LT_ENTRY = struct.Struct("<QIQI")
+
+
+def _to_bytes(s) -> bytes:
+    if isinstance(s, str):
+        return s.encode("utf-8")
+    return bytes(s)
+
+
+def build_lookup_table(path: str, items):
+    """
+    Write key-value pairs (str or bytes) into a lookup table file.
+    Keys must be unique. The file is replaced atomically.
+    """
+    pairs = sorted((_to_bytes(k), _to_bytes(v)) for k, v in items)
+    for ix in range(1, len(pairs)):
+        if pairs[ix][0] == pairs[ix - 1][0]:
+            raise ValueError("duplicate key: {!r}".format(pairs[ix][0]))
+    index_offset = _LT_HEADER.size
+    keys_offset = index_offset + _LT_ENTRY.size * len(pairs)
+    keys_size = sum(len(k) for k, _ in pairs)
+    values_offset = keys_offset + keys_size
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "wb") as fout:
+        header = _LT_HEADER.pack(
+            _LT_MAGIC,
+            _LT_VERSION,
+            len(pairs),
+            index_offset,
+            keys_offset,
+            values_offset,
+        )
+        fout.write(header)
+        ko = keys_offset
+        vo = values_offset
+        for k, v in pairs:
+            fout.write(_LT_ENTRY.pack(ko, len(k), vo, len(v)))
+            ko += len(k)
+            vo += len(v)
+        for k, _ in pairs:
+            fout.write(k)
+        for _, v in pairs:
+            fout.write(v)
+    os.replace(tmp_path, path)
+    unmap_file(path)
+    return path
+
+
+class LookupTable:
+    """
+    Read-only key-value table in a memory-mapped file
+    written by build_lookup_table().
+
+    Opening costs nothing but parsing the header;
+    a lookup is a binary search over the sorted key index,
+    reading only the pages it touches.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buf = map_file(path)
+        try:
+            header = _LT_HEADER.unpack_from(self._buf, 0)
+        except struct.error:
+            raise ValueError("not a lookup table: {}".format(path))
+        magic, version, count, index_offset, _, _ = header
+        if magic != _LT_MAGIC:
+            raise ValueError("not a lookup table: {}".format(path))
+        if version != _LT_VERSION:
+            raise ValueError("unsupported lookup table version: {}".format(version))
+        self._count = count
+        self._index_offset = index_offset
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, ix: int) -> tuple:
+        offset = self._index_offset + ix * _LT_ENTRY.size
+        return _LT_ENTRY.unpack_from(self._buf, offset)
+
+    def _key_at(self, entry: tuple) -> bytes:
+        return self._buf[entry[0] : entry[0] + entry[1]].tobytes()
+
+    def _search(self, key: bytes):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            k = self._key_at(entry)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return entry
+
+    def get_view(self, key, default=None):
+        """Like get(), but returns a zero-copy memoryview"""
+        entry = self._search(_to_bytes(key))
+        if entry is None:
+            return default
+        return self._buf[entry[2] : entry[2] + entry[3]]
+
+    def get(self, key, default=None):
+        view = self.get_view(key)
+        if view is None:
+            return default
+        return view.tobytes()
+
+    def __getitem__(self, key) -> bytes:
+        view = self.get_view(key)
+        if view is None:
+            raise KeyError(key)
+        return view.tobytes()
+
+    def __contains__(self, key):
+        return self._search(_to_bytes(key)) is not None
+
+    def keys(self):
+        for ix in range(self._count):
+            yield self._key_at(self._entry(ix))
+
+    def items(self):
+        for ix in range(self._count):
+            entry = self._entry(ix)
+            value = self._buf[entry[2] : entry[2] + entry[3]]
+            yield self._key_at(entry), value.tobytes()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+class ScratchSpace:
+    """
+    Temporary files under `root`, spread over `shard_count` subdirectories
+    so that no single directory grows huge.
+
+    Files are removed when their context exits, or by cleanup()
+    once older than `max_age` seconds, oldest first if the total size
+    exceeds `quota_bytes`.
+    """
+
+    def __init__(self, root: str, shard_count=256, max_age=86400, quota_bytes=None):
+        if not 1 <= shard_count <= 4096:
+            raise ValueError("shard_count must be within [1, 4096]")
+        self.root = os.path.abspath(root)
+        self.shard_count = shard_count
+        self.max_age = max_age
+        self.quota_bytes = quota_bytes
+        self._known_shards = set()
+        self._cleaner = None
+        self._cleaner_stop = threading.Event()
+
+    def _shard_dir(self, token: bytes) -> str:
+        shard = "{:03x}".format(int.from_bytes(token[:2], "big") % self.shard_count)
+        dirpath = os.path.join(self.root, shard)
+        if dirpath not in self._known_shards:
+            os.makedirs(dirpath, exist_ok=True)
+            self._known_shards.add(dirpath)
+        return dirpath
+
+    def path(self, ext="") -> str:
+        """A new random path; its parent directory exists"""
+        token = os.urandom(17)
+        return os.path.join(self._shard_dir(token), token.hex() + ext)
+
+    @contextlib.contextmanager
+    def file(self, ext="", mode="w+b", keep=False):
+        """Yield an opened scratch file, removed on exit unless `keep`"""
+        path = self.path(ext)
+        try:
+            fileobj = open(path, mode)
+        except FileNotFoundError:
+            # the shard directory was removed by someone else
+            self._known_shards.clear()
+            path = self.path(ext)
+            fileobj = open(path, mode)
+        try:
+            with fileobj:
+                yield fileobj
+        finally:
+            if not keep:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+
+    @contextlib.contextmanager
+    def directory(self, keep=False):
+        """Yield the path of a new scratch directory, removed on exit"""
+        path = self.path()
+        try:
+            os.mkdir(path)
+        except FileNotFoundError:
+            # the shard directory was removed by someone else
+            self._known_shards.clear()
+            path = self.path()
+            os.mkdir(path)
+        try:
+            yield path
+        finally:
+            if not keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def memory_file(self, max_size=2**20):
+        """
+        A file object backed by memory, a SpooledTemporaryFile which
+        moves to disk (under this scratch space) beyond `max_size` bytes.
+        """
+        dirpath = self._shard_dir(os.urandom(2))
+        return tempfile.SpooledTemporaryFile(max_size, dir=dirpath)
+
+    def _iter_entries(self):
+        """Yield (mtime, size, path, is_dir) for top-level and sharded entries"""
+        try:
+            top_entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for top in top_entries:
+            with contextlib.suppress(OSError):
+                if not top.is_dir(follow_symlinks=False):
+                    st = top.stat(follow_symlinks=False)
+                    yield st.st_mtime, st.st_size, top.path, False
+                    continue
+                for entry in os.scandir(top.path):
+                    with contextlib.suppress(OSError):
+                        st = entry.stat(follow_symlinks=False)
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        yield st.st_mtime, st.st_size, entry.path, is_dir
+
+    @staticmethod
+    def _remove(path: str, is_dir: bool):
+        if is_dir:
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+    def cleanup(self, max_age: float = None) -> int:
+        """Remove expired entries, then the oldest ones if over quota"""
+        max_age = self.max_age if max_age is None else max_age
+        deadline = time.time() - max_age
+        removed = 0
+        remaining = []
+        for mtime, size, path, is_dir in self._iter_entries():
+            if mtime < deadline:
+                self._remove(path, is_dir)
+                removed += 1
+            else:
+                remaining.append((mtime, size, path, is_dir))
+        if self.quota_bytes is None:
+            return removed
+        # sizes of directories are not counted recursively
+        total = sum(r[1] for r in remaining)
+        for _, size, path, is_dir in sorted(remaining):
+            if total <= self.quota_bytes:
+                break
+            self._remove(path, is_dir)
+            removed += 1
+            total -= size
+        return removed
+
+    def _run_cleaner(self, interval: float):
+        while not self._cleaner_stop.wait(interval):
+            with contextlib.suppress(OSError):
+                self.cleanup()
+
+    def start_cleaner(self, interval=600.0):
+        """Run cleanup() every `interval` seconds in a daemon thread"""
+        if self._cleaner is not None and self._cleaner.is_alive():
+            return
+        self._cleaner_stop.clear()
+        self._cleaner = threading.Thread(
+            target=self._run_cleaner,
+            args=(interval,),
+            name="volkanic-scratch-cleaner",
+            daemon=True,
+        )
+        self._cleaner.start()
+
+    def stop_cleaner(self):
+        self._cleaner_stop.set()
+        if self._cleaner is not None:
+            self._cleaner.join()
+            self._cleaner = None
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import marshal
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import Mapping
+
+# segment layout:
+#   header: magic, length of index, length of values blob
+#   index: marshaled list of (key, offset, length, codec)
+#   values blob: each top-level value serialized on its own
+_MAGIC = b"VCNF"
+_HEADER = struct.Struct("<4sQQ")
+_MARSHAL = 0
+_PICKLE = 1
+
+
+def _serialize(value) -> tuple:
+    try:
+        return _MARSHAL, marshal.dumps(value)
+    except ValueError:
+        return _PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def pack_conf(conf: dict) -> bytes:
+    index = []
+    blobs = []
+    offset = 0
+    for key, value in conf.items():
+        codec, blob = _serialize(value)
+        index.append((key, offset, len(blob), codec))
+        blobs.append(blob)
+        offset += len(blob)
+    index_bytes = marshal.dumps(index)
+    header = _HEADER.pack(_MAGIC, len(index_bytes), offset)
+    return b"".join([header, index_bytes] + blobs)
+
+
+class SharedConf(Mapping):
+    """
+    A read-only view of a config dict packed by pack_conf().
+
+    Only the index of top-level keys is decoded up front;
+    each value is decoded from the (shared) buffer on first access.
+    """
+
+    def __init__(self, buf, segment=None):
+        self._buf = buf = memoryview(buf)
+        self._segment = segment
+        self._decoded = {}
+        # a short or corrupt segment is reported as ValueError only
+        try:
+            magic, index_size, values_size = _HEADER.unpack_from(buf, 0)
+        except struct.error as exc:
+            raise ValueError("not a packed config: {}".format(exc)) from exc
+        start = _HEADER.size
+        if magic != _MAGIC or len(buf) < start + index_size + values_size:
+            raise ValueError("not a packed config")
+        try:
+            index = marshal.loads(buf[start : start + index_size])
+            index = {key: (offset, size, codec) for key, offset, size, codec in index}
+        except (EOFError, TypeError, ValueError) as exc:
+            raise ValueError("corrupt config index: {}".format(exc)) from exc
+        self._values_start = start + index_size
+        self._index = index
+
+    def __getitem__(self, key):
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        offset, size, codec = self._index[key]
+        start = self._values_start + offset
+        blob = self._buf[start : start + size]
+        value = marshal.loads(blob) if codec == _MARSHAL else pickle.loads(blob)
+        return self._decoded.setdefault(key, value)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def close(self, unlink=False):
+        """Release the buffer and the shared memory mapping behind it"""
+        self._buf.release()
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        segment.close()
+        if unlink:
+            segment.unlink()
+
+    def __del__(self):
+        # SharedMemory cannot close its mmap while this view is exported
+        self._buf.release()
+
+    def __repr__(self):
+        return "<{} keys={}>".format(self.__class__.__name__, list(self._index))
+
+
+class _AttachedSegment:
+    """
+    A read-only POSIX shared memory mapping which, unlike SharedMemory
+    (before Python 3.13), is not registered to the resource tracker.
+    Only the owner (creator) of a segment is tracked, and unlinks it.
+    """
+
+    def __init__(self, name: str):
+        import _posixshmem
+
+        fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, mode=0o600)
+        try:
+            size = os.fstat(fd).st_size
+            self._mmap = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        self.name = name
+        self.buf = memoryview(self._mmap)
+
+    def close(self):
+        self.buf.release()
+        self._mmap.close()
+
+
+def publish_conf(conf: dict, name: str = None):
+    """
+    Pack `conf` into a new shared memory segment.
+    The caller owns the segment, and should close() and unlink() it
+    once no worker attaches any more.
+    Returns: (SharedMemory, SharedConf)
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    data = pack_conf(conf)
+    segment = SharedMemory(name=name, create=True, size=max(len(data), 1))
+    segment.buf[: len(data)] = data
+    return segment, SharedConf(segment.buf, segment)
+
+
+def attach_conf(name: str) -> SharedConf:
+    if os.name == "posix":
+        # also spares workers from importing multiprocessing
+        segment = _AttachedSegment(name)
+    else:
+        # no resource tracker on Windows
+        from multiprocessing.shared_memory import SharedMemory
+
+        segment = SharedMemory(name=name)
+    return SharedConf(segment.buf, segment)
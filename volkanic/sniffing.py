@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import os
+
+# bytes read from the beginning of a file; enough for all signatures below,
+# e.g. "ustar" at offset 257 and names of the first entries in a zip file
+HEADER_SIZE = 2048
+
+# (magic bytes at offset 0, content type), longest first where they overlap
+_prefix_signatures = [
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xFF\xD8\xFF", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"\x00\x00\x01\x00", "image/x-icon"),
+    (b"\x1F\x8B", "application/gzip"),
+    (b"BZh", "application/x-bzip2"),
+    (b"\xFD7zXZ\x00", "application/x-xz"),
+    (b"\x28\xB5\x2F\xFD", "application/zstd"),
+    (b"7z\xBC\xAF\x27\x1C", "application/x-7z-compressed"),
+    (b"Rar!\x1A\x07", "application/vnd.rar"),
+    (b"\x7FELF", "application/x-elf"),
+    (b"\x00asm", "application/wasm"),
+    (b"SQLite format 3\x00", "application/vnd.sqlite3"),
+    (b"OggS", "audio/ogg"),
+    (b"fLaC", "audio/flac"),
+    (b"ID3", "audio/mpeg"),
+    (b"\xFF\xFB", "audio/mpeg"),
+    (b"\xFF\xF3", "audio/mpeg"),
+    (b"\xFF\xF2", "audio/mpeg"),
+    (b"\x1A\x45\xDF\xA3", "video/webm"),
+    (b"wOFF", "font/woff"),
+    (b"wOF2", "font/woff2"),
+]
+
+# first byte => [(magic, content type), ...], longest magic first
+_prefix_table = {}
+for _magic, _content_type in _prefix_signatures:
+    _prefix_table.setdefault(_magic[0], []).append((_magic, _content_type))
+for _candidates in _prefix_table.values():
+    _candidates.sort(key=lambda p: len(p[0]), reverse=True)
+
+_riff_subtypes = {
+    b"WEBP": "image/webp",
+    b"WAVE": "audio/wav",
+    b"AVI ": "video/x-msvideo",
+}
+
+_ftyp_brands = {
+    b"qt  ": "video/quicktime",
+    b"M4A ": "audio/mp4",
+    b"M4B ": "audio/mp4",
+    b"heic": "image/heic",
+    b"heix": "image/heic",
+    b"mif1": "image/heif",
+    b"avif": "image/avif",
+    b"3gp4": "video/3gpp",
+    b"3gp5": "video/3gpp",
+}
+
+_ooxml_prefix = "application/vnd.openxmlformats-officedocument."
+_ooxml_dirs = [
+    (b"word/", _ooxml_prefix + "wordprocessingml.document"),
+    (b"xl/", _ooxml_prefix + "spreadsheetml.sheet"),
+    (b"ppt/", _ooxml_prefix + "presentationml.presentation"),
+]
+
+
+# sizes of the known BMP info headers, BITMAPCOREHEADER to BITMAPV5HEADER
+_bmp_info_sizes = {12, 16, 40, 52, 56, 64, 108, 124}
+
+
+def _sniff_bmp(header: bytes):
+    # "BM" alone matches too much text; check the reserved zero bytes
+    # of the file header and the size of the following info header
+    if len(header) < 18 or header[6:10] != b"\x00\x00\x00\x00":
+        return
+    if int.from_bytes(header[14:18], "little") in _bmp_info_sizes:
+        return "image/bmp"
+
+
+def _sniff_riff(header: bytes):
+    return _riff_subtypes.get(header[8:12])
+
+
+def _sniff_ftyp(header: bytes):
+    return _ftyp_brands.get(header[8:12], "video/mp4")
+
+
+def _sniff_zip(header: bytes):
+    # the first entry of ODF and EPUB files is an uncompressed "mimetype"
+    name_length = int.from_bytes(header[26:28], "little")
+    if header[30 : 30 + name_length] == b"mimetype":
+        start = 30 + name_length + int.from_bytes(header[28:30], "little")
+        mimetype = header[start : start + 80].split(b"PK", 1)[0]
+        if mimetype.startswith(b"application/"):
+            return mimetype.decode("ascii", "replace")
+    # entry names are stored uncompressed in local file headers
+    for dirname, content_type in _ooxml_dirs:
+        if dirname in header:
+            return content_type
+    return "application/zip"
+
+
+def _sniff_text(header: bytes):
+    if header.startswith(b"\xEF\xBB\xBF"):
+        header = header[3:]
+    elif header.startswith((b"\xFF\xFE", b"\xFE\xFF")):
+        return "text/plain"
+    if b"\x00" in header:
+        return
+    try:
+        text = header.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # the header may end in the middle of a multi-byte char
+        if e.start < len(header) - 3:
+            return
+        text = header[: e.start].decode("utf-8")
+    text = text.lstrip()
+    if text[:1] in ("{", "["):
+        return "application/json"
+    lower = text[:256].lower()
+    if lower.startswith(("<!doctype html", "<html")):
+        return "text/html"
+    if lower.startswith("<svg") or (lower.startswith("<?xml") and "<svg" in lower):
+        return "image/svg+xml"
+    if lower.startswith("<?xml"):
+        return "application/xml"
+    return "text/plain"
+
+
+def sniff(header: bytes, text=True):
+    """
+    Guess the content type from the first bytes of a file
+    (HEADER_SIZE bytes are enough).
+
+    Args:
+        header: beginning of the content
+        text: fall back to heuristics for JSON, HTML, XML and plain text
+
+    Returns: (str or None) a MIME type
+    """
+    if not header:
+        return
+    for magic, content_type in _prefix_table.get(header[0], ()):
+        if header.startswith(magic):
+            return content_type
+    if header.startswith(b"BM"):
+        content_type = _sniff_bmp(header)
+        if content_type:
+            return content_type
+    if header.startswith(b"RIFF"):
+        return _sniff_riff(header)
+    if header[4:8] == b"ftyp":
+        return _sniff_ftyp(header)
+    if header.startswith((b"PK\x03\x04", b"PK\x05\x06")):
+        return _sniff_zip(header)
+    if header[257:262] == b"ustar":
+        return "application/x-tar"
+    if text:
+        return _sniff_text(header)
+
+
+def sniff_stream(fileobj, text=True):
+    """
+    Guess the content type of a binary file object from its header.
+    Seekable streams are rewound; others lose HEADER_SIZE bytes
+    unless they support peek().
+    """
+    peek = getattr(fileobj, "peek", None)
+    if fileobj.seekable():
+        pos = fileobj.tell()
+        header = fileobj.read(HEADER_SIZE)
+        fileobj.seek(pos)
+    elif peek is not None:
+        header = peek(HEADER_SIZE)[:HEADER_SIZE]
+    else:
+        header = fileobj.read(HEADER_SIZE)
+    return sniff(header, text)
+
+
+def sniff_file(path: str, text=True):
+    with open(path, "rb") as fin:
+        return sniff(fin.read(HEADER_SIZE), text)
+
+
+def _iter_file_paths(root: str):
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            entries = list(os.scandir(dirpath))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path
+            except OSError:
+                continue
+
+
+def _sniff_file_or_none(path: str, text: bool):
+    try:
+        return sniff_file(path, text)
+    except OSError:
+        return
+
+
+def sniff_tree(root: str, workers=8, text=True):
+    """
+    Yield (path, content_type) for every regular file under `root`,
+    reading headers in a thread pool; unreadable files give None.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = _iter_file_paths(root)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() submits everything at once, so go chunk by chunk
+        while True:
+            chunk = [p for _, p in zip(range(workers * 64), paths)]
+            if not chunk:
+                return
+            results = executor.map(_sniff_file_or_none, chunk, [text] * len(chunk))
+            yield from zip(chunk, results)
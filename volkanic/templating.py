@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+
+def build_jinja2_env(options: dict, search_paths, cache_dir: str = None):
+    """
+    Args:
+        options: keyword arguments for jinja2.Environment
+        search_paths: template directories for a FileSystemLoader,
+            unless `options` has a "loader"
+        cache_dir: where compiled templates are stored and reused
+            across processes and restarts, None to disable
+    """
+    import jinja2
+
+    options = dict(options)
+    if "loader" not in options:
+        options["loader"] = jinja2.FileSystemLoader(search_paths)
+    if cache_dir and "bytecode_cache" not in options:
+        options["bytecode_cache"] = jinja2.FileSystemBytecodeCache(cache_dir)
+    return jinja2.Environment(**options)
+
+
+def precompile_templates(env, filter_func=None) -> list:
+    """
+    Compile all templates of `env`, filling its bytecode cache;
+    meant to run at deploy time.
+    Returns: names of the compiled templates
+    """
+    names = env.list_templates(filter_func=filter_func)
+    for name in names:
+        env.get_template(name)
+    return names
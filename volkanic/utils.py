@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # coding: utf-8
+import collections
 import functools
 import importlib
 import os
+import re
 import sys
 import threading
+import time
 from typing import Union
 
 Pathlike = Union[str, os.PathLike]
@@ -51,18 +54,112 @@ def load_symbol(symbolpath):
     return symbol
 
 
-def load_variables(*contexts):
-    import re
+@functools.lru_cache(maxsize=1024)
+def _split_symbolpath(symbolpath: str) -> tuple:
+    modname, _, attrpath = symbolpath.partition(":")
+    return modname, tuple(attrpath.split(".")) if attrpath else ()
+
+
+# symbolpath => (module, first attribute, symbol), least recently used first
+_symbol_cache = collections.OrderedDict()
+_symbol_cache_maxsize = 1024
+
+
+def load_symbol_cached(symbolpath: str):
+    """
+    Like load_symbol(), but remembers results.
+
+    A cached entry is dropped when its module is no longer in sys.modules,
+    or when the module's top-level attribute has been replaced
+    (e.g. by importlib.reload()).
+    """
+    try:
+        module, head, symbol = _symbol_cache[symbolpath]
+    except KeyError:
+        pass
+    else:
+        modname, attrnames = _split_symbolpath(symbolpath)
+        if sys.modules.get(modname) is module and (
+            not attrnames or getattr(module, attrnames[0], None) is head
+        ):
+            try:
+                _symbol_cache.move_to_end(symbolpath)
+            except KeyError:
+                pass
+            return symbol
+    modname, attrnames = _split_symbolpath(symbolpath)
+    module = importlib.import_module(modname)
+    if attrnames:
+        head = getattr(module, attrnames[0])
+        symbol = attr_query(head, *attrnames[1:])
+    else:
+        head = symbol = module
+    _symbol_cache[symbolpath] = module, head, symbol
+    while len(_symbol_cache) > _symbol_cache_maxsize:
+        try:
+            _symbol_cache.popitem(last=False)
+        except KeyError:
+            break
+    return symbol
+
+
+def clear_symbol_cache(modname: str = None):
+    """Forget cached symbols, all or those of module `modname`"""
+    if modname is None:
+        return _symbol_cache.clear()
+    for symbolpath in list(_symbol_cache):
+        if _split_symbolpath(symbolpath)[0] == modname:
+            _symbol_cache.pop(symbolpath, None)
 
+
+_variable_name_regex = re.compile(r"[.:]")
+
+
+def _normalize_context(ctx) -> dict:
+    if isinstance(ctx, dict):
+        return ctx
+    return {_variable_name_regex.split(x)[-1]: x for x in ctx}
+
+
+def load_variables(*contexts):
     scope = {}
     for ctx in contexts:
-        if not isinstance(ctx, dict):
-            ctx = {re.split(r"[.:]", x)[-1]: x for x in ctx}
-        for key, val in ctx.items():
+        for key, val in _normalize_context(ctx).items():
             scope[key] = load_symbol(val)
     return scope
 
 
+class VariableScope:
+    """
+    A compiled form of load_variables(*contexts).
+
+    The context spec is parsed once; symbols are resolved
+    through load_symbol_cached() and kept until refresh().
+    Calling the object returns a new dict to be used as a scope.
+    """
+
+    def __init__(self, *contexts):
+        spec = {}
+        for ctx in contexts:
+            spec.update(_normalize_context(ctx))
+        self.spec = spec
+        self._scope = None
+
+    def refresh(self) -> dict:
+        scope = {k: load_symbol_cached(v) for k, v in self.spec.items()}
+        self._scope = scope
+        return scope
+
+    def __call__(self, **extra) -> dict:
+        scope = self._scope
+        if scope is None:
+            scope = self.refresh()
+        scope = scope.copy()
+        if extra:
+            scope.update(extra)
+        return scope
+
+
 def _abs_path_join(*paths):
     path = os.path.join(*paths)
     return os.path.abspath(path)
@@ -78,15 +175,67 @@ def abs_path_join(*paths) -> str:
     return _abs_path_join(*paths)
 
 
+# directories known to exist, to save makedirs() syscalls
+_known_dirs = set()
+
+
+def _makedirs_cached(dirpath: str):
+    if dirpath in _known_dirs:
+        return
+    os.makedirs(dirpath, exist_ok=True)
+    _known_dirs.add(dirpath)
+
+
+def forget_known_dirs(*dirpaths):
+    """
+    Forget directories remembered by abs_path_join_and_mkdirs(),
+    e.g. after removing them; all of them if no argument is given.
+    """
+    if not dirpaths:
+        return _known_dirs.clear()
+    for dirpath in dirpaths:
+        _known_dirs.discard(os.path.abspath(dirpath))
+
+
 def abs_path_join_and_mkdirs(*paths):
+    """
+    Join paths into an absolute path and create the parent directory
+    -- or the path itself if the last part ends with '/'.
+    Created directories are remembered per process, so the directory
+    is not guaranteed to exist if it is removed later by others:
+    call forget_known_dirs(), or open files with open_and_mkdirs(),
+    which recreates the directory on FileNotFoundError.
+    """
     path = abs_path_join(*paths)
     if paths[-1].endswith("/"):
-        os.makedirs(path, exist_ok=True)
+        _makedirs_cached(path)
     else:
-        os.makedirs(os.path.split(path)[0], exist_ok=True)
+        _makedirs_cached(os.path.split(path)[0])
     return path
 
 
+def prepare_dirs(*dirpaths) -> list:
+    """Create many directories at once, parents first"""
+    dirpaths = sorted({os.path.abspath(p) for p in dirpaths})
+    for dirpath in dirpaths:
+        _makedirs_cached(dirpath)
+    return dirpaths
+
+
+def open_and_mkdirs(path: str, mode="w", **kwargs):
+    """Open a file for writing, creating its parent directory if missing"""
+    path = os.path.abspath(path)
+    dirpath = os.path.dirname(path)
+    _makedirs_cached(dirpath)
+    try:
+        return open(path, mode, **kwargs)
+    except FileNotFoundError:
+        # the directory has been removed since it was created
+        _known_dirs.discard(dirpath)
+        _makedirs_cached(dirpath)
+        return open(path, mode, **kwargs)
+
+
 def under_parent_dir(ref_path: str, *paths) -> str:
     ref_path = os.path.abspath(ref_path)
     parent_dir = os.path.dirname(ref_path)
@@ -169,15 +318,117 @@ def desktop_open(*paths):
         handler(path)
 
 
+def _find_spec_in_meta_path(fullname: str, path=None):
+    for finder in sys.meta_path:
+        find_spec = getattr(finder, "find_spec", None)
+        if find_spec is None:
+            continue
+        spec = find_spec(fullname, path)
+        if spec is not None:
+            return spec
+
+
+def _find_spec_without_import(name: str):
+    """
+    Find the spec of a module without executing it or its parent packages.
+    Finders in sys.meta_path (e.g. of editable installs) are consulted
+    for each part, with the parent's search locations for submodules.
+    """
+    import importlib.util
+
+    mod = sys.modules.get(name)
+    if mod is not None and getattr(mod, "__spec__", None) is not None:
+        return mod.__spec__
+    parts = name.split(".")
+    spec = None
+    for ix, part in enumerate(parts):
+        fullname = ".".join(parts[: ix + 1])
+        if ix == 0:
+            try:
+                spec = importlib.util.find_spec(part)
+            except ValueError:
+                # in sys.modules but __spec__ is None
+                spec = None
+        else:
+            locations = spec.submodule_search_locations
+            if locations is None:
+                spec = None
+            else:
+                spec = _find_spec_in_meta_path(fullname, locations)
+        if spec is None:
+            raise ModuleNotFoundError(
+                "No module named {!r}".format(fullname),
+                name=name,
+            )
+    return spec
+
+
+def _get_spec_path(name: str):
+    mod = sys.modules.get(name)
+    path = getattr(mod, "__file__", None)
+    if path:
+        return path, None
+    spec = _find_spec_without_import(name)
+    if spec.has_location:
+        return spec.origin, spec
+    # frozen stdlib modules (Python 3.11+) know their source file
+    return getattr(spec.loader_state, "filename", None), spec
+
+
 def where(name):
-    mod = importlib.import_module(name)
-    path = getattr(mod, "__file__", "NotAvailable")
+    path, spec = _get_spec_path(name)
+    if path is None:
+        locations = list(spec.submodule_search_locations or [])
+        # namespace packages have no __init__ file
+        return locations[0] if locations else "NotAvailable"
     dir_, filename = os.path.split(path)
     if filename.startswith("__init__."):
         return dir_
     return path
 
 
+@functools.lru_cache(maxsize=None)
+def _get_packages_distributions() -> dict:
+    try:
+        from importlib.metadata import packages_distributions
+    except ImportError:
+        return {}
+    return packages_distributions()
+
+
+def get_distribution_version(name: str):
+    """Version of the installed distribution providing module `name`"""
+    from importlib import metadata
+
+    top = name.split(".")[0]
+    for dist_name in _get_packages_distributions().get(top, [top]):
+        try:
+            return metadata.version(dist_name)
+        except metadata.PackageNotFoundError:
+            continue
+
+
+def where_many(names, versions=False) -> dict:
+    """
+    Locate many modules at once, none of them imported.
+
+    Returns: {name: path} or {name: (path, version)} if `versions`;
+        path is None for modules not found
+    """
+    results = {}
+    for name in names:
+        try:
+            path = where(name)
+        except ModuleNotFoundError:
+            path = None
+        if versions:
+            version = get_distribution_version(name) if path else None
+            results[name] = path, version
+        else:
+            results[name] = path
+    return results
+
+
 def where_site_packages():
     for name in ["pip", "easy_install"]:
         try:
@@ -189,7 +440,7 @@ def where_site_packages():
             return p
 
 
-def json_default(obj):
+def _json_method_or_str(obj):
     # https://bugs.python.org/issue27362
     try:
         return obj.__json__()
@@ -197,11 +448,54 @@ def json_default(obj):
         return str(obj)
 
 
+# type => function converting its instances to JSON-serializable values
+_json_converters = {}
+# type => resolved converter, including types not registered
+_json_converter_cache = {}
+
+
+def register_json_converter(cls: type, func):
+    """Make json_default() convert instances of `cls` (and subclasses)"""
+    _json_converters[cls] = func
+    _json_converter_cache.clear()
+
+
+def _resolve_json_converter(cls: type):
+    for c in cls.__mro__:
+        if c in _json_converters:
+            return _json_converters[c]
+    # __json__ may only be found on the class, an instance dict
+    # or through __getattr__; otherwise str() is the answer for sure
+    if (
+        hasattr(cls, "__json__")
+        or getattr(cls, "__dictoffset__", 0)
+        or hasattr(cls, "__getattr__")
+    ):
+        return _json_method_or_str
+    return str
+
+
+def json_default(obj):
+    cls = type(obj)
+    try:
+        func = _json_converter_cache[cls]
+    except KeyError:
+        func = _json_converter_cache.setdefault(cls, _resolve_json_converter(cls))
+    return func(obj)
+
+
 def indented_json_dumps(obj, dumps=None, **kwargs):
+    """
+    Args:
+        obj: object to serialize
+        dumps: a json.dumps-like function; by default that of
+            the backend selected by volkanic.jsonio.set_json_backend()
+        kwargs: keyword arguments for json.dumps
+    """
     if dumps is None:
-        import json
+        from volkanic.jsonio import get_json_backend
 
-        dumps = json.dumps
+        dumps = get_json_backend().dumps
     kwargs.setdefault("indent", 4)
     kwargs.setdefault("default", json_default)
     kwargs.setdefault("sort_keys", True)
@@ -209,6 +503,17 @@ def indented_json_dumps(obj, dumps=None, **kwargs):
     return dumps(obj, **kwargs)
 
 
+def indented_json_dumpb(obj, **kwargs) -> bytes:
+    """Like indented_json_dumps(), but returns UTF-8 encoded bytes"""
+    from volkanic.jsonio import get_json_backend
+
+    kwargs.setdefault("indent", 4)
+    kwargs.setdefault("default", json_default)
+    kwargs.setdefault("sort_keys", True)
+    kwargs.setdefault("ensure_ascii", False)
+    return get_json_backend().dumpb(obj, **kwargs)
+
+
 def indented_json_print(obj, dumps=None, **kwargs):
     print_kwargs = {}
     print_keywords = ["sep", "end", "file", "flush"]
@@ -251,15 +556,15 @@ def printfmt(*args, sep=" ", end=os.linesep):
     return sep.join(str(x) for x in args) + end
 
 
-def guess_content_type(content: bytes):
-    if content.startswith(b"%PDF-"):
-        return "application/pdf"
-    if content.startswith(b"\x89PNG\r\n\x1a\n"):
-        return "image/png"
-    if content.startswith(b"\xFF\xD8\xFF\xE0"):
-        return "image/jpeg"
-    if content.startswith(b"\xFF\xD8\xFF\xEE"):
-        return "image/jpeg"
+def guess_content_type(content: bytes, text=False):
+    """
+    Guess the MIME type of binary content by its signature;
+    see volkanic.sniffing for the formats recognized,
+    and for file, stream and directory tree variants.
+    """
+    from volkanic.sniffing import HEADER_SIZE, sniff
+
+    return sniff(content[:HEADER_SIZE], text)
 
 
 # noinspection PyPep8Naming
@@ -311,3 +616,215 @@ class per_thread_cached_property(_property):
             return obj.__dict__[key]
         except KeyError:
             return obj.__dict__.setdefault(key, self.func(obj))
+
+
+class CacheStats:
+    """Counters of a caching descriptor; approximate under contention"""
+
+    __slots__ = ["hits", "misses", "stale_hits"]
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class _CacheSlot:
+    __slots__ = ["value", "expires_at", "filled", "nbytes", "lock"]
+
+    def __init__(self):
+        self.value = None
+        self.expires_at = None
+        self.filled = False
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        if not self.filled:
+            return False
+        return self.expires_at is None or time.monotonic() < self.expires_at
+
+    def get(self, compute, ttl, stats: CacheStats):
+        """
+        Return the cached value, or compute it.
+        Once expired, one thread recomputes the value
+        while others keep getting the stale one.
+        """
+        if self.is_fresh():
+            stats.hits += 1
+            return self.value
+        if self.filled:
+            if not self.lock.acquire(blocking=False):
+                stats.stale_hits += 1
+                return self.value
+        else:
+            self.lock.acquire()
+        try:
+            if self.is_fresh():
+                stats.hits += 1
+                return self.value
+            stats.misses += 1
+            value = compute()
+            self.value = value
+            self.expires_at = time.monotonic() + ttl if ttl else None
+            self.filled = True
+            return value
+        finally:
+            self.lock.release()
+
+
+# noinspection PyPep8Naming
+class ttl_cached_property(_property):
+    """
+    A property that is recomputed at most once per `ttl` seconds per instance.
+    Deleting the attribute resets the property.
+
+        class Remote:
+            @ttl_cached_property(60)
+            def metadata(self):
+                ...
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.func = None
+        self.stats = CacheStats()
+
+    def __call__(self, func):
+        self.__doc__ = getattr(func, "__doc__")
+        self.func = func
+        return self
+
+    def __set_name__(self, owner, name):
+        self.slot_key = "{}_ttl_cache_slot".format(name)
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        try:
+            slot = obj.__dict__[self.slot_key]
+        except KeyError:
+            slot = obj.__dict__.setdefault(self.slot_key, _CacheSlot())
+        # _CacheSlot.is_fresh() inlined; fresh hits skip building the partial
+        if slot.filled and (
+            slot.expires_at is None or time.monotonic() < slot.expires_at
+        ):
+            self.stats.hits += 1
+            return slot.value
+        return slot.get(functools.partial(self.func, obj), self.ttl, self.stats)
+
+    def __delete__(self, obj):
+        obj.__dict__.pop(self.slot_key, None)
+
+
+_kwargs_mark = object()
+
+
+def _make_cache_key(args: tuple, kwargs: dict):
+    if not kwargs:
+        return args
+    return args + (_kwargs_mark,) + tuple(sorted(kwargs.items()))
+
+
+class _MethodCache:
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float, sizeof):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.slots = collections.OrderedDict()
+        self.nbytes = 0
+        self.stats = CacheStats()
+        self.lock = threading.Lock()
+
+    def _get_slot(self, key) -> _CacheSlot:
+        with self.lock:
+            try:
+                self.slots.move_to_end(key)
+                return self.slots[key]
+            except KeyError:
+                return self.slots.setdefault(key, _CacheSlot())
+
+    def _account(self, key, slot: _CacheSlot):
+        nbytes = self.sizeof(slot.value) if self.max_bytes else 0
+        with self.lock:
+            if self.slots.get(key) is not slot:
+                return
+            self.nbytes += nbytes - slot.nbytes
+            slot.nbytes = nbytes
+            while self.slots and (
+                (self.maxsize is not None and len(self.slots) > self.maxsize)
+                or (self.max_bytes and self.nbytes > self.max_bytes)
+            ):
+                _, evicted = self.slots.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def get(self, key, compute):
+        slot = self._get_slot(key)
+        misses = self.stats.misses
+        value = slot.get(compute, self.ttl, self.stats)
+        if self.stats.misses != misses:
+            self._account(key, slot)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.slots.clear()
+            self.nbytes = 0
+
+
+# noinspection PyPep8Naming
+class cached_method(_property):
+    """
+    Per-instance memoization of a method with hashable arguments,
+    evicting least recently used results beyond `maxsize` entries
+    (None for unbounded, as with functools.lru_cache)
+    or `max_bytes` (as measured by `sizeof`, shallow by default).
+    Expired results (with `ttl`) are recomputed by one thread at a time.
+
+        class Remote:
+            @cached_method(maxsize=256, ttl=600)
+            def lookup(self, key):
+                ...
+
+        remote.lookup.cache_info()
+        remote.lookup.cache_clear()
+    """
+
+    def __init__(self, func=None, maxsize=128, max_bytes=None, ttl=None, sizeof=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or sys.getsizeof
+        self.func = None
+        if func is not None:
+            self(func)
+
+    def __call__(self, func):
+        self.__doc__ = getattr(func, "__doc__")
+        self.func = func
+        return self
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        func = self.func
+        cache = _MethodCache(self.maxsize, self.max_bytes, self.ttl, self.sizeof)
+
+        @functools.wraps(func)
+        def _method(*args, **kwargs):
+            key = _make_cache_key(args, kwargs)
+            return cache.get(key, lambda: func(obj, *args, **kwargs))
+
+        def cache_info():
+            info = cache.stats.to_dict()
+            info.update(size=len(cache.slots), nbytes=cache.nbytes)
+            return info
+
+        _method.cache_info = cache_info
+        _method.cache_clear = cache.clear
+        # shadows this non-data descriptor from now on
+        return obj.__dict__.setdefault(func.__name__, _method)
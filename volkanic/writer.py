@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import contextlib
+import os
+import threading
+import time
+
+from volkanic import utils
+
+
+def _fsync_dir(dirpath: str):
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        # e.g. directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _dirs_to_fsync(dirpath: str) -> list:
+    """
+    Directories to fsync for entries created in `dirpath`, including
+    parents of the directories on the way which do not exist yet
+    """
+    dirpaths = [dirpath]
+    while not os.path.isdir(dirpath):
+        parent = os.path.dirname(dirpath)
+        if parent == dirpath:
+            break
+        dirpaths.append(parent)
+        dirpath = parent
+    return dirpaths
+
+
+def _write_and_replace(path: str, data: bytes, fsync: bool):
+    tmp_path = "{}.{}-{}.tmp".format(path, os.getpid(), threading.get_ident())
+    try:
+        # recreates the directory if removed since abs_path_join_and_mkdirs()
+        with utils.open_and_mkdirs(tmp_path, "wb") as fout:
+            fout.write(data)
+            if fsync:
+                fout.flush()
+                os.fsync(fout.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path: str, data, fsync=True):
+    """Write a file so readers see either the old or the new content"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = utils.abs_path_join(path)
+    dirpaths = _dirs_to_fsync(os.path.dirname(path)) if fsync else []
+    path = utils.abs_path_join_and_mkdirs(path)
+    _write_and_replace(path, data, fsync)
+    for dirpath in dirpaths:
+        _fsync_dir(dirpath)
+
+
+class BatchWriter:
+    """
+    Write many files atomically, optionally on a thread pool.
+
+    Each file is written to a temp file, fsync'ed and renamed into place;
+    the containing directories, and parents of directories created
+    for the batch, are fsync'ed once per batch, in flush().
+    Content is durable after flush() returns.
+    With `workers`, write() blocks while `max_pending` writes are queued.
+
+        with BatchWriter(root, workers=4) as writer:
+            for name, data in outputs:
+                writer.write(name, data)
+    """
+
+    def __init__(self, root: str = None, fsync=True, workers=0, max_pending=256):
+        self.root = root
+        self.fsync = fsync
+        self._dirty_dirs = set()
+        self._futures = []
+        self._executor = None
+        self._slots = None
+        if workers:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+            self._slots = threading.BoundedSemaphore(max_pending)
+        self.file_count = 0
+        self.byte_count = 0
+        self._count_lock = threading.Lock()
+        self._started_at = time.perf_counter()
+
+    def _write(self, path: str, data: bytes):
+        _write_and_replace(path, data, self.fsync)
+        with self._count_lock:
+            self.file_count += 1
+            self.byte_count += len(data)
+
+    def write(self, path: str, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self.root:
+            path = os.path.join(self.root, path)
+        path = utils.abs_path_join(path)
+        dirpath = os.path.dirname(path)
+        if dirpath not in self._dirty_dirs:
+            # new directories are fsync'ed into their parents as well
+            self._dirty_dirs.update(_dirs_to_fsync(dirpath))
+        path = utils.abs_path_join_and_mkdirs(path)
+        if self._executor is None:
+            return self._write(path, data)
+        self._slots.acquire()
+        try:
+            fut = self._executor.submit(self._write, path, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(fut)
+
+    def flush(self):
+        """Wait for queued writes, then fsync directories of the batch"""
+        futures, self._futures = self._futures, []
+        errors = [f.exception() for f in futures]
+        dirpaths, self._dirty_dirs = self._dirty_dirs, set()
+        if self.fsync:
+            for dirpath in dirpaths:
+                _fsync_dir(dirpath)
+        for exc in errors:
+            if exc is not None:
+                raise exc
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def stats(self) -> dict:
+        seconds = time.perf_counter() - self._started_at
+        return {
+            "files": self.file_count,
+            "bytes": self.byte_count,
+            "seconds": seconds,
+            "files_per_second": self.file_count / seconds if seconds else 0,
+            "bytes_per_second": self.byte_count / seconds if seconds else 0,
+        }